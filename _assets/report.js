@@ -0,0 +1,43 @@
+const ESC_MAP={"&":"&amp;","<":"&lt;",">":"&gt;",'"':"&quot;","'":"&#x27;"};
+function escHtml(s){ return String(s).replace(/[&<>"']/g,c=>ESC_MAP[c]); }
+function fmtYen(n){ if(n===null||n===undefined||n==="") return "-"; const v=Number(n); if(!Number.isFinite(v)) return "-"; return "¥"+v.toLocaleString("ja-JP"); }
+function quantileSorted(xs,p){ if(xs.length===1) return xs[0]; const i=(xs.length-1)*p; const lo=Math.floor(i); const hi=Math.min(lo+1,xs.length-1); const w=i-lo; return Math.round(xs[lo]*(1-w)+xs[hi]*w); }
+function computeStats(arr){ const n=arr.length; if(n===0) return {mean:null,median:null,p25:null,p75:null,min:null,max:null,count:0}; const xs=arr.slice().sort((a,b)=>a-b); let sum=0; for(const v of xs) sum+=v; const m=Math.floor(n/2); return {mean:Math.round(sum/n), median:n%2===1?xs[m]:Math.round((xs[m-1]+xs[m])/2), p25:quantileSorted(xs,0.25), p75:quantileSorted(xs,0.75), min:xs[0], max:xs[n-1], count:n}; }
+function fmtDateLabelHtml(iso,wcls){ const [y,m,d]=iso.split("-"); const w="日月火水木金土"[new Date(Number(y),Number(m)-1,Number(d)).getDay()]; return escHtml(y+"年"+m+"月"+d+"日")+'<span class="wday '+escHtml(wcls||"weekday")+'">（'+w+'）</span>'; }
+let DAY_DETAILS=null;
+function getDayDetails(){ if(DAY_DETAILS) return DAY_DETAILS; try{ const el=document.getElementById("day-details-data"); DAY_DETAILS=JSON.parse((el&&el.textContent)||"{}"); }catch(e){ DAY_DETAILS={}; } return DAY_DETAILS; }
+let modalTitleObserver=null;
+window.addEventListener("DOMContentLoaded",()=>{
+  const backdrop=document.getElementById("modalBackdrop"); const btnClose=document.getElementById("modalClose");
+  if(backdrop) backdrop.addEventListener("click",(e)=>{ if(e.target===backdrop) closeDayModal(); });
+  if(btnClose) btnClose.addEventListener("click",closeDayModal);
+  const modalTableBody=document.getElementById("modalTableBody");
+  if(modalTableBody) modalTableBody.addEventListener("mouseover",(e)=>{ const t=e.target.closest(".link-btn, td:last-child"); if(t) t.removeAttribute("title"); });
+  document.addEventListener("keydown",(e)=>{ if(e.key==="Escape") closeDayModal(); });
+  document.body.addEventListener("click",(e)=>{ const btn=e.target.closest(".jump-btn"); if(!btn||btn.disabled) return; const iso=btn.getAttribute("data-iso-date"); if(iso) openDayModal(iso); });
+  initGraphTooltip();
+  if(window.requestIdleCallback) window.requestIdleCallback(getDayDetails);
+});
+function openDayModal(isoDate){ const title=document.getElementById("modalTitle"); const stats=document.getElementById("modalStats"); const body=document.getElementById("modalTableBody"); const item=getDayDetails()[isoDate];
+  if(!title||!stats||!body) return;
+  title.innerHTML=item? fmtDateLabelHtml(isoDate,item.wcls) : escHtml(isoDate);
+  if(!item){ stats.innerHTML=""; body.innerHTML='<tr><td colspan="8" class="muted">この日の明細はありません</td></tr>'; document.getElementById("modalBackdrop")&&document.getElementById("modalBackdrop").classList.add("open"); document.getElementById("modalBody")&&(document.getElementById("modalBody").scrollTop=0); return; }
+  const rows=item.rows||[];
+  const prices=rows.map(r=>Number(r.price)).filter(v=>Number.isFinite(v));
+  const ps=computeStats(prices);
+  stats.innerHTML=['<span class="pill">件数 '+rows.length+'</span>','<span class="pill">平均 '+escHtml(fmtYen(ps.mean))+'</span>','<span class="pill">中央値 '+escHtml(fmtYen(ps.median))+'</span>','<span class="pill">下位25%点 '+escHtml(fmtYen(ps.p25))+'</span>','<span class="pill">上位25%点 '+escHtml(fmtYen(ps.p75))+'</span>','<span class="pill">最小 '+escHtml(fmtYen(ps.min))+'</span>','<span class="pill">最大 '+escHtml(fmtYen(ps.max))+'</span>'].join(" ");
+  const html=rows.map((r,idx)=>{ const url=r.url||""; const reviewsCount=r.reviews_count!=null?String(r.reviews_count):""; const rating=r.rating!=null?parseFloat(r.rating).toFixed(2):""; const detailLink=url?`<a class="link-btn" href="${escHtml(url)}" target="_blank" rel="noreferrer">詳細</a>`:"-"; const labelShort=r.label_short||""; const titleShort=r.title_short||""; const subtitleShort=r.subtitle_short||""; return `<tr><td>${idx+1}</td><td style='text-align:right;'>${escHtml(fmtYen(r.price))}</td><td>${escHtml(titleShort||"-")}</td><td style='text-align:right;'>${escHtml(rating||"-")}</td><td style='text-align:right;'>${escHtml(reviewsCount||"-")}</td><td>${escHtml(subtitleShort||"-")}</td><td style="text-align:center;">${detailLink}</td><td>${escHtml(labelShort)}</td></tr>`; }).join("");
+  body.innerHTML=html||`<tr><td colspan="8" class="muted">明細なし</td></tr>`;
+  if(!modalTitleObserver) modalTitleObserver=new MutationObserver(m=>{ m.forEach(mut=>{ const cell=mut.target; const row=cell.parentElement; if(cell.tagName==='TD'&&row&&cell===row.lastElementChild) cell.removeAttribute('title'); }); });
+  modalTitleObserver.observe(body,{attributes:true,subtree:true,attributeFilter:['title']});
+  document.getElementById("modalBackdrop").classList.add("open");
+  document.getElementById("modalBody").scrollTop=0;
+}
+function closeDayModal(){ const b=document.getElementById("modalBackdrop"); if(b) b.classList.remove("open"); if(modalTitleObserver) modalTitleObserver.disconnect(); }
+let tooltipEl=null; let tooltipPinned=false;
+function updateTooltipPosition(circle){ if(!tooltipEl) return; tooltipEl.style.display='block'; const circleRect=circle.getBoundingClientRect(); const px=circleRect.left+circleRect.width/2; const circleTop=circleRect.top; const offset=8; const tooltipHeight=tooltipEl.offsetHeight; const tooltipWidth=tooltipEl.offsetWidth; let tooltipTop=circleTop-tooltipHeight-offset; let tooltipLeft=px+12; tooltipEl.style.left=tooltipLeft+'px'; tooltipEl.style.top=tooltipTop+'px'; const tooltipRect=tooltipEl.getBoundingClientRect(); if(tooltipRect.right>window.innerWidth-10) tooltipEl.style.left=(px-tooltipWidth-12)+'px'; if(tooltipRect.left<10) tooltipEl.style.left='10px'; if(tooltipRect.top<10) tooltipEl.style.top=(circleRect.bottom+offset)+'px'; const finalRect=tooltipEl.getBoundingClientRect(); if(finalRect.bottom>window.innerHeight-10) tooltipEl.style.top=(window.innerHeight-finalRect.height-10)+'px'; }
+function fmtDateMdLabel(iso){ const [y,m,d]=iso.split("-"); const w="日月火水木金土"[new Date(Number(y),Number(m)-1,Number(d)).getDay()]; return Number(m)+"月"+Number(d)+"日（"+w+"）"; }
+function showTooltipForCircle(c){ const iso=c.getAttribute('data-day'); const item=iso?getDayDetails()[iso]:null; const s=item&&item.stats; if(!s||!tooltipEl) return; const date=fmtDateMdLabel(iso); const avg=fmtYen(s.avg); const median=fmtYen(s.median); const p25=fmtYen(s.p25); const p75=fmtYen(s.p75); const min=fmtYen(s.min); const max=fmtYen(s.max); const count=String(s.count); tooltipEl.innerHTML=`<div class="tooltip-header">${escHtml(date)}</div><div class="tooltip-section"><div class="tooltip-row"><span class="tooltip-label">平均</span><span class="tooltip-value">${escHtml(avg)}</span></div><div class="tooltip-row"><span class="tooltip-label">中央値</span><span class="tooltip-value">${escHtml(median)}</span></div></div><div class="tooltip-section"><div class="tooltip-row"><span class="tooltip-label">下位25%点</span><span class="tooltip-value">${escHtml(p25)}</span></div><div class="tooltip-row"><span class="tooltip-label">上位25%点</span><span class="tooltip-value">${escHtml(p75)}</span></div></div><div class="tooltip-section"><div class="tooltip-row"><span class="tooltip-label">最小</span><span class="tooltip-value">${escHtml(min)}</span></div><div class="tooltip-row"><span class="tooltip-label">最大</span><span class="tooltip-value">${escHtml(max)}</span></div></div><div class="tooltip-row" style="margin-top:8px; padding-top:8px; border-top:1px solid #f3f4f6;"><span class="tooltip-label">件数</span><span class="tooltip-value">${escHtml(count)}</span></div>`; updateTooltipPosition(c); tooltipEl.style.display='block'; }
+function hideTooltip(){ if(tooltipEl) tooltipEl.style.display='none'; tooltipPinned=false; }
+function initGraphTooltip(){ if(!tooltipEl){ tooltipEl=document.createElement('div'); tooltipEl.className='graph-tooltip'; tooltipEl.style.display='none'; document.body.appendChild(tooltipEl); } document.addEventListener("click",(e)=>{ if(tooltipPinned&&tooltipEl&&!tooltipEl.contains(e.target)&&!e.target.closest('svg circle[data-day]')) hideTooltip(); }); const points=document.getElementById('dayPoints'); if(points) attachTooltipListeners(points); }
+function attachTooltipListeners(points){ const circleOf=e=>e.target.closest('circle[data-day]'); points.addEventListener('mouseover',e=>{ const c=circleOf(e); if(c) showTooltipForCircle(c); }); points.addEventListener('mouseout',e=>{ if(!tooltipPinned&&tooltipEl) tooltipEl.style.display='none'; }); points.addEventListener('mousemove',e=>{ const c=circleOf(e); if(!c||!tooltipEl||tooltipEl.style.display==='none') return; updateTooltipPosition(c); }); points.addEventListener('click',e=>{ const c=circleOf(e); if(!c) return; e.stopPropagation(); e.preventDefault(); tooltipPinned=true; showTooltipForCircle(c); }); }
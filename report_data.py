@@ -5,11 +5,51 @@ import statistics
 from collections import defaultdict
 from dataclasses import dataclass
 from datetime import date, datetime
+from itertools import groupby
 from pathlib import Path
 from typing import DefaultDict, Dict, List, Optional, Tuple
 
+try:
+    import numpy as np
+except ImportError:  # 未インストール時は日別統計を Python のループで算出する
+    np = None
 
-@dataclass(frozen=True)
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:  # 未インストール時は標準 csv で読み込む
+    pa = None
+
+# pyarrow 読み込み時の列型（pyarrow の型名）
+AVG_COLUMN_TYPES = {
+    "checkin": "date32",
+    "avg_price_yen": "int64",
+    "count": "int64",
+    "min_price_yen": "int64",
+    "max_price_yen": "int64",
+    "url": "string",
+}
+DETAIL_COLUMN_TYPES = {
+    "checkin": "date32",
+    "price_yen": "int64",
+    "listing_url": "string",
+    "raw_label": "string",
+    "title": "string",
+    "guests": "int64",
+    "bedrooms": "int64",
+    "beds": "int64",
+    "reviews_count": "int64",
+    "rating": "float64",
+    "subtitle": "string",
+}
+# 日別統計を NumPy で算出する最小件数（これ未満は Python のループの方が速い）
+NUMPY_MIN_ROWS = 500
+# 欠損とみなす値（_parse_int / _parse_float と同じ扱い）
+NULL_VALUES = ["", "none", "None", "NONE"]
+
+
+@dataclass(frozen=True, slots=True)
 class AvgRow:
     checkin: date
     avg_price_yen: Optional[int]
@@ -19,7 +59,7 @@ class AvgRow:
     url: str
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DetailRow:
     checkin: date
     price_yen: int
@@ -136,6 +176,55 @@ def quantile(values: list, p: float) -> Optional[int]:
     return round(xs[lo] * (1 - w) + xs[hi] * w)
 
 
+# pyarrow で CSV を列単位に読み込む。pyarrow 未導入・型変換失敗時は None
+#
+# 引数:
+#   path (Path): CSVパス
+#   column_types (Dict[str, str]): 列名 -> pyarrow の型名
+#
+# 戻り値:
+#   Dict[str, list] or None: 列名 -> 値リスト（存在しない列は全て None）
+def _read_csv_columns(path: Path, column_types: Dict[str, str]) -> Optional[Dict[str, list]]:
+    if pa is None:
+        return None
+    try:
+        table = pa_csv.read_csv(
+            path,
+            read_options=pa_csv.ReadOptions(block_size=1 << 20),
+            convert_options=pa_csv.ConvertOptions(
+                column_types={k: getattr(pa, t)() for k, t in column_types.items()},
+                include_columns=list(column_types),
+                include_missing_columns=True,
+                null_values=NULL_VALUES,
+            ),
+        )
+    except pa.ArrowInvalid:
+        # 想定外の値を含む場合は標準 csv の寛容なパースに任せる
+        return None
+    return {name: table.column(name).to_pylist() for name in column_types}
+
+
+# CSV と同名の Parquet（scrape 側が pyarrow ありで出力）を列ごとに読む。CSV より古い・読めない場合は None
+#
+# 引数:
+#   path (Path): CSVパス（拡張子を .parquet に替えたファイルを読む）
+#   column_types (Dict[str, str]): 列名 -> pyarrow の型名（読み込む列）
+#
+# 戻り値:
+#   Dict[str, list] or None: 列名 -> 値リスト
+def _read_parquet_columns(path: Path, column_types: Dict[str, str]) -> Optional[Dict[str, list]]:
+    if pa is None:
+        return None
+    parquet_path = path.with_suffix(".parquet")
+    try:
+        if parquet_path.stat().st_mtime < path.stat().st_mtime:
+            return None
+        table = pq.read_table(parquet_path, columns=list(column_types))
+    except (OSError, ValueError):
+        return None
+    return {name: table.column(name).to_pylist() for name in column_types}
+
+
 # 平均CSVを読み込み AvgRow リストとして返す（checkin 順）
 #
 # 引数:
@@ -144,6 +233,16 @@ def quantile(values: list, p: float) -> Optional[int]:
 # 戻り値:
 #   List[AvgRow]: checkin 順にソート済み
 def read_avg_csv(path: Path) -> List[AvgRow]:
+    cols = _read_csv_columns(path, AVG_COLUMN_TYPES)
+    if cols is not None:
+        # checkin 必須。欠損行はスキップ
+        rows = [
+            AvgRow(checkin=d, avg_price_yen=a, count=c or 0, min_price_yen=mn, max_price_yen=mx, url=u or "")
+            for d, a, c, mn, mx, u in zip(*(cols[k] for k in AVG_COLUMN_TYPES))
+            if d is not None
+        ]
+        return sorted(rows, key=lambda x: x.checkin)
+
     rows: List[AvgRow] = []
     with path.open(newline="", encoding="utf-8-sig") as f:
         reader = csv.DictReader(f)
@@ -166,7 +265,7 @@ def read_avg_csv(path: Path) -> List[AvgRow]:
     return sorted(rows, key=lambda x: x.checkin)
 
 
-# 明細CSVを読み込み DetailRow リストとして返す。checkin・価格必須、欠損行はスキップ
+# 明細CSV（同名の新しい Parquet があればそちら）を読み込み DetailRow リストとして返す。checkin・価格必須、欠損行はスキップ
 #
 # 引数:
 #   path (Path): 明細CSVパス
@@ -174,6 +273,30 @@ def read_avg_csv(path: Path) -> List[AvgRow]:
 # 戻り値:
 #   List[DetailRow]: checkin, price_yen, listing_url でソート済み
 def read_details_csv(path: Path) -> List[DetailRow]:
+    cols = _read_parquet_columns(path, DETAIL_COLUMN_TYPES) or _read_csv_columns(path, DETAIL_COLUMN_TYPES)
+    if cols is not None:
+        # checkin と price_yen 必須。欠損行はスキップ
+        rows = [
+            DetailRow(
+                checkin=d,
+                price_yen=p,
+                listing_url=url or "",
+                raw_label=label or "",
+                title=title or "",
+                guests=guests,
+                bedrooms=bedrooms,
+                beds=beds,
+                reviews_count=reviews_count,
+                rating=rating,
+                subtitle=subtitle or None,
+            )
+            for d, p, url, label, title, guests, bedrooms, beds, reviews_count, rating, subtitle in zip(
+                *(cols[k] for k in DETAIL_COLUMN_TYPES)
+            )
+            if d is not None and p is not None
+        ]
+        return sorted(rows, key=lambda x: (x.checkin, x.price_yen, x.listing_url))
+
     rows: List[DetailRow] = []
     with path.open(newline="", encoding="utf-8-sig") as f:
         reader = csv.DictReader(f)
@@ -205,17 +328,13 @@ def read_details_csv(path: Path) -> List[DetailRow]:
 # AvgRow を年月でグループ化
 #
 # 引数:
-#   rows (List[AvgRow]): 平均行リスト
+#   rows (List[AvgRow]): 平均行リスト（checkin 順ソート済み。read_avg_csv の戻り値）
 #
 # 戻り値:
 #   Dict[(year, month), List[AvgRow]]: 年月ごとの AvgRow リスト
 def group_by_month(rows: List[AvgRow]) -> Dict[Tuple[int, int], List[AvgRow]]:
-    by_month: Dict[Tuple[int, int], List[AvgRow]] = defaultdict(list)
-    for r in rows:
-        key = (r.checkin.year, r.checkin.month)
-        by_month[key].append(r)
-    # 年月順にソートして返す
-    return dict(sorted(by_month.items()))
+    # checkin 順なので同じ年月は連続する。境目ごとに切り出すだけでよい
+    return {key: list(g) for key, g in groupby(rows, key=lambda r: (r.checkin.year, r.checkin.month))}
 
 
 # 日付ごとの中央値・p25・p75・min・max を算出
@@ -226,6 +345,10 @@ def group_by_month(rows: List[AvgRow]) -> Dict[Tuple[int, int], List[AvgRow]]:
 # 戻り値:
 #   Dict[date, Dict]: 日別統計（median, p25, p75, min, max）
 def build_detail_stats_by_day(details_rows: List[DetailRow]) -> Dict[date, Dict[str, Optional[int]]]:
+    # 件数が多く NumPy がある場合は一括で算出
+    if np is not None and len(details_rows) >= NUMPY_MIN_ROWS:
+        return _build_detail_stats_by_day_np(details_rows)
+
     # 日付ごとに価格リストを集約
     by_day: DefaultDict[date, List[int]] = defaultdict(list)
     for r in details_rows:
@@ -242,3 +365,46 @@ def build_detail_stats_by_day(details_rows: List[DetailRow]) -> Dict[date, Dict[
             "max": max(prices) if prices else None,
         }
     return out
+
+
+# build_detail_stats_by_day の NumPy 版。(日付, 価格) で並べ、日ごとの区間から各統計を一括算出
+#
+# 引数:
+#   details_rows (List[DetailRow]): 明細行リスト（1件以上）
+#
+# 戻り値:
+#   Dict[date, Dict]: 日別統計（median, p25, p75, min, max）
+def _build_detail_stats_by_day_np(details_rows: List[DetailRow]) -> Dict[date, Dict[str, Optional[int]]]:
+    n = len(details_rows)
+    days = np.fromiter((r.checkin.toordinal() for r in details_rows), dtype=np.int64, count=n)
+    prices = np.fromiter((r.price_yen for r in details_rows), dtype=np.int64, count=n)
+    order = np.lexsort((prices, days))
+    days = days[order]
+    prices = prices[order]
+    # 日付が変わる位置が各日の先頭。日ごとの価格は昇順に並んでいる
+    starts = np.flatnonzero(np.concatenate(([True], days[1:] != days[:-1])))
+    counts = np.diff(np.append(starts, n))
+
+    # quantile() と同じ線形補間（同じ順序の浮動小数演算で結果を一致させる）
+    def quantiles(p: float):
+        i = (counts - 1) * p
+        lo = i.astype(np.int64)
+        hi = np.minimum(lo + 1, counts - 1)
+        w = i - lo
+        return prices[starts + lo] * (1 - w) + prices[starts + hi] * w
+
+    # statistics.median と同じく偶数件は中央2値の平均（奇数件は lower == upper）
+    upper = starts + counts // 2
+    lower = upper - 1 + counts % 2
+    medians = (prices[lower] + prices[upper]) / 2
+    out: Dict[date, Dict[str, Optional[int]]] = {}
+    for d, med, p25, p75, mn, mx in zip(
+        days[starts].tolist(),
+        medians.tolist(),
+        quantiles(0.25).tolist(),
+        quantiles(0.75).tolist(),
+        prices[starts].tolist(),
+        prices[starts + counts - 1].tolist(),
+    ):
+        out[date.fromordinal(d)] = {"median": round(med), "p25": round(p25), "p75": round(p75), "min": mn, "max": mx}
+    return out
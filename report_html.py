@@ -1,12 +1,13 @@
 """祝日・フォーマット・HTML/SVG生成。"""
 
 import os
-from collections import defaultdict
+import shutil
+from functools import lru_cache
 from datetime import date, datetime
+from itertools import groupby
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
 from urllib.parse import quote
-from xml.sax.saxutils import escape as _xml_escape
 
 from report_data import (
     AvgRow,
@@ -21,6 +22,14 @@ from report_data import (
 DIR_HTML_HISTORY = Path("html")
 FMT_GENERATED_AT = "%Y-%m-%d %H:%M"
 WEEKDAYS_JA = ["月", "火", "水", "木", "金", "土", "日"]
+# モーダル表示時の最大文字数（超過分は「…」で省略）
+MODAL_TITLE_MAX = 90
+MODAL_SUBTITLE_MAX = 150
+MODAL_LABEL_MAX = 180
+# HTML エスケープ用の変換表（1回の走査で置換）
+_ESCAPE_TABLE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#x27;"})
+# 検索 URL 用の行き先（環境変数 AIRBNB_DESTINATION）。全行で共通のため quote 済みで保持
+DESTINATION_QUOTED = quote(os.getenv("AIRBNB_DESTINATION", "大阪市 此花区"))
 
 
 # HTML用にエスケープする
@@ -31,7 +40,7 @@ WEEKDAYS_JA = ["月", "火", "水", "木", "金", "土", "日"]
 # 戻り値:
 #   str: エスケープ済み文字列
 def escape(s: object) -> str:
-    return _xml_escape(str(s), {'"': "&quot;", "'": "&#x27;"})
+    return str(s).translate(_ESCAPE_TABLE)
 
 
 # 日付を「YYYY年MM月DD日」形式で返す
@@ -56,18 +65,6 @@ def fmt_md(d: date) -> str:
     return f"{d.month}/{d.day}"
 
 
-# 年月を省いた日付＋曜日（MM月DD日（曜））を返す
-#
-# 引数:
-#   d (date): 対象日付
-#
-# 戻り値:
-#   str: フォーマット済み文字列
-def fmt_date_jp_with_weekday_no_year(d: date) -> str:
-    w = WEEKDAYS_JA[d.weekday()]
-    return f"{d.month}月{d.day}日（{w}）"
-
-
 # 日付＋曜日を HTML エスケープ済みで返す（色なし）
 #
 # 引数:
@@ -185,14 +182,15 @@ def _autumn_equinox_day(year: int) -> date:
     return date(year, 9, day)
 
 
-# 指定年の祝日セットを返す（振替休日・国民の休日を含む）
+# 指定年の祝日セットを返す（振替休日・国民の休日を含む）。年ごとにキャッシュ
 #
 # 引数:
 #   year (int): 年
 #
 # 戻り値:
-#   Set[date]: 祝日セット
-def _japan_holidays_for_year(year: int) -> Set[date]:
+#   FrozenSet[date]: 祝日セット
+@lru_cache(maxsize=None)
+def _japan_holidays_for_year(year: int) -> FrozenSet[date]:
     # 固定祝日＋第n月曜（成人の日等）＋春分・秋分
     hols: Set[date] = {
         date(year, 1, 1), date(year, 2, 11), date(year, 2, 23),
@@ -213,36 +211,37 @@ def _japan_holidays_for_year(year: int) -> Set[date]:
                     added_substitute.add(d)
                     break
     hols |= added_substitute
-    # 国民の休日（祝日にはさまれた平日）を追加
-    year_start = date(year, 1, 1)
-    year_end = date(year, 12, 31)
-    d = year_start
+    # 国民の休日（祝日にはさまれた平日）を追加。候補は祝日の翌日のみなので1年分は走査しない
     added_citizen: Set[date] = set()
-    while d <= year_end:
-        if d not in hols and d.weekday() != 6:
-            prev_day = d.fromordinal(d.toordinal() - 1)
-            next_day = d.fromordinal(d.toordinal() + 1)
-            if prev_day in hols and next_day in hols:
-                added_citizen.add(d)
-        d = d.fromordinal(d.toordinal() + 1)
+    for h in hols:
+        d = h.fromordinal(h.toordinal() + 1)
+        if d.year != year or d in hols or d.weekday() == 6:
+            continue
+        next_day = d.fromordinal(d.toordinal() + 1)
+        if next_day in hols:
+            added_citizen.add(d)
     hols |= added_citizen
-    return hols
+    return frozenset(hols)
 
 
-# 期間内の祝日セットを返す
+# 期間内の祝日セットを返す。同じ期間の再呼び出しはキャッシュを返す
 #
 # 引数:
 #   start_d (date): 開始日
 #   end_d (date): 終了日
 #
 # 戻り値:
-#   Set[date]: 期間内の祝日セット
-def load_jp_holidays_for_range(start_d: date, end_d: date) -> Set[date]:
+#   FrozenSet[date]: 期間内の祝日セット
+@lru_cache(maxsize=32)
+def load_jp_holidays_for_range(start_d: date, end_d: date) -> FrozenSet[date]:
+    # 1年丸ごとの指定なら年単位のセットをそのまま返す
+    if start_d.year == end_d.year and (start_d.month, start_d.day) == (1, 1) and (end_d.month, end_d.day) == (12, 31):
+        return _japan_holidays_for_year(start_d.year)
     out: Set[date] = set()
     for y in range(start_d.year, end_d.year + 1):
         out |= _japan_holidays_for_year(y)
     # 指定期間内の祝日のみ返す
-    return {d for d in out if start_d <= d <= end_d}
+    return frozenset(d for d in out if start_d <= d <= end_d)
 
 
 # 環境変数から検索条件を読み、Airbnb 検索 URL を生成
@@ -254,9 +253,7 @@ def load_jp_holidays_for_range(start_d: date, end_d: date) -> Set[date]:
 # 戻り値:
 #   str: 検索 URL
 def build_search_url(checkin: date, checkout: date) -> str:
-    from datetime import timedelta
     # 環境変数から検索条件を取得（未設定時はデフォルト）
-    destination = os.getenv("AIRBNB_DESTINATION", "大阪市 此花区")
     adults = int(os.getenv("AIRBNB_ADULTS", "4"))
     children = int(os.getenv("AIRBNB_CHILDREN", "0"))
     infants = int(os.getenv("AIRBNB_INFANTS", "0"))
@@ -264,8 +261,6 @@ def build_search_url(checkin: date, checkout: date) -> str:
     price_min = os.getenv("AIRBNB_PRICE_MIN")
     price_max = os.getenv("AIRBNB_PRICE_MAX")
     params = {
-        "checkin": checkin.isoformat(),
-        "checkout": checkout.isoformat(),
         "adults": str(adults),
         "children": str(children),
         "infants": str(infants),
@@ -275,8 +270,9 @@ def build_search_url(checkin: date, checkout: date) -> str:
         params["price_min"] = price_min
     if price_max:
         params["price_max"] = price_max
-    query = "&".join([f"{k}={quote(v)}" for k, v in params.items()])
-    return f"https://www.airbnb.jp/s/{quote(destination)}/homes?{query}"
+    # ISO 日付は数字と「-」のみのため quote 不要
+    query = f"checkin={checkin.isoformat()}&checkout={checkout.isoformat()}&" + "&".join([f"{k}={quote(v)}" for k, v in params.items()])
+    return f"https://www.airbnb.jp/s/{DESTINATION_QUOTED}/homes?{query}"
 
 
 # AvgRow の URL があればそのまま、なければ動的生成
@@ -295,7 +291,8 @@ def get_or_build_search_url(r: AvgRow) -> str:
     return build_search_url(r.checkin, checkout)
 
 
-# 既存 HTML を mtime で日付付き名にリネームし html/ へ退避
+# 既存 HTML を mtime で日付付き名にして html/ へ退避
+# 元ファイルは残す（ハードリンク、別ファイルシステムならコピー）ため、生成失敗時も index.html は欠けない
 #
 # 引数:
 #   out_path (Path): 出力先 HTML パス
@@ -319,7 +316,10 @@ def backup_existing_html(out_path: Path) -> None:
     while candidate.exists():
         candidate = DIR_HTML_HISTORY / f"{stem}{suffix}_{i}{out_path.suffix}"
         i += 1
-    out_path.rename(candidate)
+    try:
+        os.link(out_path, candidate)
+    except OSError:
+        shutil.copy2(out_path, candidate)
 
 
 # 1ヶ月単位の概要表 HTML を生成
@@ -513,23 +513,12 @@ def svg_line_chart(
             dash_attr = f' stroke-dasharray="{dash_pattern}"' if dash_pattern else ""
             chart_parts.append(f'<polyline fill="none" stroke="{color}" stroke-width="{sw}"{dash_attr} points="{seg}" pointer-events="none"/>')
 
+    # ツールチップの値はモーダル用 JSON の stats から引く（circle には日付のみ持たせる）
+    # 共通の見た目は <g> にまとめ、イベントも <g> で1回だけ受ける
+    chart_parts.append('<g id="dayPoints" fill="#2563eb" stroke="white" stroke-width="1" style="cursor:pointer; pointer-events:auto;">')
     for x, y, r in avg_points:
-        s = detail_stats_by_day.get(r.checkin, {})
-        date_str = fmt_date_jp_with_weekday_no_year(r.checkin)
-        chart_parts.append(
-            f'<circle cx="{x:.2f}" cy="{y:.2f}" r="3.6" fill="#2563eb" stroke="white" stroke-width="1" '
-            f'style="cursor:pointer; pointer-events:auto;" '
-            f'data-tooltip-date="{escape(date_str)}" '
-            f'data-tooltip-avg="{escape(fmt_yen(r.avg_price_yen))}" '
-            f'data-tooltip-median="{escape(fmt_yen(s.get("median")))}" '
-            f'data-tooltip-p25="{escape(fmt_yen(s.get("p25")))}" '
-            f'data-tooltip-p75="{escape(fmt_yen(s.get("p75")))}" '
-            f'data-tooltip-min="{escape(fmt_yen(s.get("min")))}" '
-            f'data-tooltip-max="{escape(fmt_yen(s.get("max")))}" '
-            f'data-tooltip-count="{escape(str(r.count))}" '
-            f'data-tooltip-x="{x:.2f}" '
-            f'data-tooltip-y="{y:.2f}"></circle>'
-        )
+        chart_parts.append(f'<circle cx="{x:.2f}" cy="{y:.2f}" r="3.6" data-day="{r.checkin.isoformat()}"/>')
+    chart_parts.append("</g>")
     chart_parts.append("</svg>")
     return f"""<div style="display: flex; align-items: stretch;">
         {'\n'.join(y_axis_parts)}
@@ -539,41 +528,73 @@ def svg_line_chart(
     </div>"""
 
 
-# モーダル用：日付（ISO）ごとに明細 JSON を生成
+# 文字列を指定文字数で切り詰める（超過時は末尾に「…」）
+#
+# 引数:
+#   s (str): 対象文字列
+#   n (int): 最大文字数
+#
+# 戻り値:
+#   str: 切り詰め後の文字列
+def _truncate(s: str, n: int) -> str:
+    return s if len(s) <= n else s[:n] + "…"
+
+
+# モーダル・グラフツールチップ用：日付（ISO）ごとに明細・統計 JSON を生成
 #
 # 引数:
-#   details_rows (List[DetailRow]): 明細行リスト
+#   details_rows (List[DetailRow]): 明細行リスト（checkin 順ソート済み。read_details_csv の戻り値）
 #   holidays (Set[date]): 祝日セット
+#   avg_rows (List[AvgRow]): 平均行リスト
+#   detail_stats_by_day (Dict): 日別詳細統計
 #
 # 戻り値:
-#   Dict: ISO日付 -> {dateLabelHtml, wcls, rows}
-def build_detail_payload_by_day(details_rows: List[DetailRow], holidays: Set[date]) -> Dict[str, Dict[str, object]]:
-    # 日付ごとに明細をグループ化
-    by_day: Dict[date, List[DetailRow]] = defaultdict(list)
-    for r in details_rows:
-        by_day[r.checkin].append(r)
+#   Dict: ISO日付 -> {wcls, rows, stats}（行の文字列は省略済み・未エスケープ。日付ラベルとエスケープは表示時に JS 側で行う）
+#         stats はグラフの点（平均あり）の日のみ。明細のない日は rows が空
+def build_detail_payload_by_day(
+    details_rows: List[DetailRow],
+    holidays: Set[date],
+    avg_rows: List[AvgRow],
+    detail_stats_by_day: Dict[date, Dict[str, Optional[int]]],
+) -> Dict[str, Dict[str, object]]:
     payload = {}
-    for d in sorted(by_day.keys()):
-        rows = sorted(by_day[d], key=lambda x: x.price_yen)
+    # checkin 順なので同じ日付の明細は連続する。境目ごとにグループ化
+    for d, day_rows in groupby(details_rows, key=lambda x: x.checkin):
+        # 価格昇順で出力（JS 側では並べ替えない）
+        rows = sorted(day_rows, key=lambda x: x.price_yen)
         payload[d.isoformat()] = {
-            "dateLabelHtml": fmt_date_jp_with_weekday_html(d, holidays),
             "wcls": weekday_class(d, holidays),
             "rows": [
                 {
                     "price": r.price_yen,
                     "url": r.listing_url,
-                    "label": r.raw_label,
-                    "title": r.title,
+                    "label_short": _truncate(r.raw_label, MODAL_LABEL_MAX),
+                    "title_short": _truncate(r.title, MODAL_TITLE_MAX),
                     "guests": r.guests,
                     "bedrooms": r.bedrooms,
                     "beds": r.beds,
                     "reviews_count": r.reviews_count,
                     "rating": r.rating,
-                    "subtitle": r.subtitle,
+                    "subtitle_short": _truncate(r.subtitle or "", MODAL_SUBTITLE_MAX),
                 }
                 for r in rows
             ],
         }
+    # グラフの点ごとのツールチップ統計
+    for r in avg_rows:
+        if r.avg_price_yen is None:
+            continue
+        s = detail_stats_by_day.get(r.checkin, {})
+        item = payload.setdefault(r.checkin.isoformat(), {"wcls": weekday_class(r.checkin, holidays), "rows": []})
+        item["stats"] = {
+            "avg": r.avg_price_yen,
+            "median": s.get("median"),
+            "p25": s.get("p25"),
+            "p75": s.get("p75"),
+            "min": s.get("min"),
+            "max": s.get("max"),
+            "count": r.count,
+        }
     return payload
 
 
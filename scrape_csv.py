@@ -1,18 +1,28 @@
-"""CSV出力系。既存ファイルの退避・平均CSV・明細CSVへの書き込み。"""
+"""CSV出力系。既存ファイルの退避・平均CSV・明細CSV（と明細 Parquet）への書き込み。"""
 
 import csv
-from datetime import datetime
+from datetime import date, datetime
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # 未インストール時は明細 Parquet を出力しない（CSV のみ）
+    pa = None
 
 # 出力先・退避ファイル名書式
 DATA_DIR = Path("data")
 OUTPUT_CSV = DATA_DIR / "konohana_daily_avg.csv"
 OUTPUT_DETAIL_CSV = DATA_DIR / "konohana_daily_details.csv"
+# 明細の列指向コピー（pyarrow がある場合のみ。レポートはこちらを優先して読む）
+OUTPUT_DETAIL_PARQUET = DATA_DIR / "konohana_daily_details.parquet"
 FMT_DATED_SUFFIX = "%Y%m%d_%H%M%S"
+# 出力ファイルの書き込みバッファ（行ごとの write を OS へ渡さない）
+OUT_BUFFER_SIZE = 1 << 20
 
 
-# 既存 CSV を日時付きで退避（上書き防止）
+# 既存 CSV（と明細 Parquet）を日時付きで退避（上書き防止）
 #
 # 引数:
 #   （なし）
@@ -21,7 +31,7 @@ FMT_DATED_SUFFIX = "%Y%m%d_%H%M%S"
 #   None
 def backup_existing_csvs() -> None:
     DATA_DIR.mkdir(exist_ok=True)
-    for p in (OUTPUT_CSV, OUTPUT_DETAIL_CSV):
+    for p in (OUTPUT_CSV, OUTPUT_DETAIL_CSV, OUTPUT_DETAIL_PARQUET):
         if p.exists():
             # mtime で日付付きファイル名を生成し data/ 内にリネーム退避
             stem, ext = p.stem, p.suffix
@@ -93,6 +103,42 @@ def write_avg_row(
     writer.writerow([checkin, avg_price, count, min_price, max_price, url])
 
 
+# 明細の整数列の値をそろえる（数値文字列は int に変換し、それ以外は欠損扱い。CSV と Parquet で同じ値にするため）
+#
+# 引数:
+#   value (Any): 明細行の値
+#
+# 戻り値:
+#   int or None: 整数値（変換できなければ None）
+def _int_value(value: Any) -> Optional[int]:
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            return None
+    return None
+
+
+# 明細の評価の値をそろえる（数値文字列は float に変換し、それ以外は欠損扱い。CSV と Parquet で同じ値にするため）
+#
+# 引数:
+#   value (Any): 明細行の値
+#
+# 戻り値:
+#   int or float or None: 評価（変換できなければ None）
+def _float_value(value: Any) -> Optional[float]:
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+
 # 1日分の明細行を書き込む
 #
 # 引数:
@@ -103,22 +149,62 @@ def write_avg_row(
 # 戻り値:
 #   None
 def write_detail_rows(writer: csv.writer, checkin: str, details: List[Dict[str, Any]]) -> None:
-    # 各明細を1行ずつ書き込む
-    for row in details:
-        writer.writerow(
-            [
-                checkin,
-                row.get("price_yen"),
-                row.get("listing_url", ""),
-                row.get("raw_label", ""),
-                row.get("title", ""),
-                row.get("guests"),
-                row.get("bedrooms"),
-                row.get("beds"),
-                row.get("reviews_count"),
-                row.get("rating"),
-                row.get("subtitle", ""),
-            ]
+    # 1日分の明細をまとめて書き込む（文字列に改行・カンマを含むためクォートは csv に任せる）
+    writer.writerows(
+        (
+            checkin,
+            _int_value(row.get("price_yen")),
+            row.get("listing_url", ""),
+            row.get("raw_label", ""),
+            row.get("title", ""),
+            _int_value(row.get("guests")),
+            _int_value(row.get("bedrooms")),
+            _int_value(row.get("beds")),
+            _int_value(row.get("reviews_count")),
+            _float_value(row.get("rating")),
+            row.get("subtitle", ""),
         )
+        for row in details
+    )
+
+
+# 明細行から整数列の値を取り出す（CSV と同じく _int_value でそろえる）
+#
+# 引数:
+#   rows (List[Tuple[str, Dict]]): (チェックイン日, 明細行) のリスト
+#   key (str): 列名
+#
+# 戻り値:
+#   list: 各行の値（変換できなければ None）
+def _int_column(rows: List[Tuple[str, Dict[str, Any]]], key: str) -> list:
+    return [_int_value(row.get(key)) for _, row in rows]
 
 
+# 全日分の明細を Parquet（Snappy 圧縮・文字列列は辞書エンコード）で書き出す
+#
+# 引数:
+#   details_by_day (List[Tuple[str, List[Dict]]]): (チェックイン日（ISO形式）, その日の明細行リスト) のリスト
+#
+# 戻り値:
+#   Path or None: 書き出したパス（pyarrow 未インストール時は None）
+def write_detail_parquet(details_by_day: List[Tuple[str, List[Dict[str, Any]]]]) -> Optional[Path]:
+    if pa is None:
+        return None
+    rows = [(checkin, row) for checkin, details in details_by_day for row in details]
+    table = pa.table(
+        {
+            "checkin": pa.array([date.fromisoformat(checkin) for checkin, _ in rows], pa.date32()),
+            "price_yen": pa.array(_int_column(rows, "price_yen"), pa.int32()),
+            "listing_url": pa.array([row.get("listing_url", "") for _, row in rows], pa.string()),
+            "raw_label": pa.array([row.get("raw_label", "") for _, row in rows], pa.string()),
+            "title": pa.array([row.get("title", "") for _, row in rows], pa.string()),
+            "guests": pa.array(_int_column(rows, "guests"), pa.int32()),
+            "bedrooms": pa.array(_int_column(rows, "bedrooms"), pa.int32()),
+            "beds": pa.array(_int_column(rows, "beds"), pa.int32()),
+            "reviews_count": pa.array(_int_column(rows, "reviews_count"), pa.int32()),
+            "rating": pa.array([None if v is None else float(v) for v in (_float_value(row.get("rating")) for _, row in rows)], pa.float64()),
+            "subtitle": pa.array([row.get("subtitle") or None for _, row in rows], pa.string()),
+        }
+    )
+    pq.write_table(table, OUTPUT_DETAIL_PARQUET, compression="snappy", use_dictionary=True)
+    return OUTPUT_DETAIL_PARQUET
@@ -1,12 +1,13 @@
-"""DOM からの物件情報抽出。XPath・カード解析。"""
+"""DOM からの物件情報抽出。XPath・カード解析（ページ内の要素は1回の JS 実行でまとめて取得）。"""
 
+import base64
+import json
 import re
-from datetime import date
-from typing import Dict, List, Optional
-
-from selenium.webdriver.common.by import By
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
 
 from scrape_html_parse import (
+    build_room_url,
     get_price_threshold,
     pick_bedrooms_from_text,
     pick_beds_from_text,
@@ -22,77 +23,323 @@ RATING_MIN = 4.79
 REVIEWS_COUNT_MIN = 20
 
 
-# 物件カードのリンク（/rooms/ を含む a 要素）を拾う XPath
+# 物件カードのリンク（/rooms/ を含む a 要素）を拾う CSS セレクタ
 #
 # 引数:
 #   （なし）
 #
 # 戻り値:
-#   str: XPath 文字列
-def listing_anchors_xpath() -> str:
-    return (
-        '//a[contains(@href, "/rooms/") and contains(@target, "listing_")]'
-        ' | //a[contains(@href, "/rooms/") and @aria-labelledby]'
-        ' | //a[contains(@href, "/rooms/")]'
-    )
+#   str: CSS セレクタ文字列
+def listing_anchors_css() -> str:
+    return 'a[href*="/rooms/"]'
 
 
-# カード候補要素の XPath（DOM 変更に備え複数パターンを列挙）
+# カード候補要素の CSS セレクタ（DOM 変更に備え複数パターンを列挙）
 #
 # 引数:
 #   （なし）
 #
 # 戻り値:
-#   str: XPath 文字列
-def card_candidates_xpath() -> str:
+#   str: CSS セレクタ文字列
+def card_candidates_css() -> str:
     return (
-        listing_anchors_xpath()
-        + ' | //div[@itemprop="itemListElement"]'
-        + ' | //div[@data-testid="card-container"]'
-        + ' | //div[contains(@data-testid, "property-card")]'
+        listing_anchors_css()
+        + ', div[itemprop="itemListElement"]'
+        + ', div[data-testid="card-container"]'
+        + ', div[data-testid*="property-card"]'
     )
 
 
-
-
-# カード内の価格 span の XPath（aria-label に「1泊」を含む）
+# 価格 span の CSS セレクタ（aria-label に「1泊」「/泊」を含む。ページ全体・カード内の両方で使う）
 #
 # 引数:
 #   （なし）
 #
 # 戻り値:
-#   str: XPath 文字列
-def price_span_in_card_xpath() -> str:
-    return (
-        './/span[@aria-label and ('
-        'contains(@aria-label, "（1泊）") or contains(@aria-label, "1泊") or contains(@aria-label, "/泊")'
-        ')]'
-    )
-
+#   str: CSS セレクタ文字列
+def price_span_css() -> str:
+    return 'span[aria-label*="1泊"], span[aria-label*="/泊"]'
+
+
+# カード内の各要素を探す XPath（JS 側で document.evaluate に渡す。文字列・祖先条件を含むため CSS にできないもの）
+_XPATH_DETAILS_LINK = ".//a[contains(@href, '/rooms/')] | .//meta[@itemprop='url']"
+_XPATH_GUESTS = (
+    ".//span[contains(text(), '人') or contains(text(), 'guests') or contains(text(), '名')] | "
+    ".//div[contains(text(), '人') or contains(text(), 'guests') or contains(text(), '名')] | "
+    ".//span[contains(@aria-label, '人') or contains(@aria-label, 'guests') or contains(@aria-label, '名')] | "
+    ".//div[contains(@aria-label, '人') or contains(@aria-label, 'guests')] | "
+    ".//span[contains(@data-testid, 'guest')] | "
+    ".//div[contains(@data-testid, 'guest')]"
+)
+_XPATHS_LONG_TITLE = (
+    ".//div[@data-testid='listing-card-title']",
+    ".//span[@data-testid='listing-card-title']",
+    ".//a[@data-testid='listing-card-title']",
+)
+_XPATH_SUBTITLE = ".//div[@data-testid='listing-card-subtitle'] | .//span[@data-testid='listing-card-subtitle']"
+_XPATH_BEDROOMS = (
+    ".//span[contains(text(), '寝室') or contains(text(), 'bedroom') or contains(text(), 'BR')] | "
+    ".//div[contains(text(), '寝室') or contains(text(), 'bedroom') or contains(text(), 'BR')] | "
+    ".//span[contains(@aria-label, '寝室') or contains(@aria-label, 'bedroom')] | "
+    ".//div[contains(@aria-label, '寝室') or contains(@aria-label, 'bedroom')] | "
+    ".//span[contains(@data-testid, 'bedroom')] | "
+    ".//div[contains(@data-testid, 'bedroom')]"
+)
+_XPATH_BEDS = (
+    ".//span[contains(text(), 'ベッド')] | "
+    ".//span[contains(text(), 'bed') and not(contains(text(), 'bedroom'))] | "
+    ".//div[contains(text(), 'ベッド')] | "
+    ".//div[contains(text(), 'bed') and not(contains(text(), 'bedroom'))] | "
+    ".//span[contains(@aria-label, 'ベッド')] | "
+    ".//span[contains(@aria-label, 'bed') and not(contains(@aria-label, 'bedroom'))] | "
+    ".//div[contains(@aria-label, 'ベッド')] | "
+    ".//div[contains(@aria-label, 'bed') and not(contains(@aria-label, 'bedroom'))] | "
+    ".//span[contains(@data-testid, 'bed') and not(contains(@data-testid, 'bedroom'))] | "
+    ".//div[contains(@data-testid, 'bed') and not(contains(@data-testid, 'bedroom'))]"
+)
+_XPATH_PRICE_ROW = ".//div[@data-testid='price-availability-row']"
+_XPATH_RATING_SPANS = ".//span[@aria-hidden='true'] | .//span[contains(text(), '★') or contains(text(), '⭐')]"
+_XPATH_RATINGS = (
+    ".//span[contains(@aria-label, '星') or contains(@aria-label, 'star') or contains(@aria-label, 'rating')] | "
+    ".//div[contains(@data-testid, 'rating') or contains(@aria-label, 'rating') or contains(@aria-label, 'star')] | "
+    ".//span[contains(@data-testid, 'rating') or contains(@data-testid, 'star')] | "
+    ".//span[contains(text(), '★') or contains(text(), '⭐')] | "
+    ".//div[contains(text(), '★') or contains(text(), '⭐')] | "
+    ".//span[contains(@class, 'rating') or contains(@class, 'star')] | "
+    ".//div[contains(@class, 'rating') or contains(@class, 'star')]"
+)
+# URL・テキストから数値を拾う正規表現（カードごとにコンパイルしないよう事前に用意）
+_ADULTS_PATTERN = re.compile(r"adults=(\d+)")
+_RATING_LOCALIZED_PATTERN = re.compile(r"\s*(\d+(?:\.\d+)?)\s*\((\d+)\)")
+# ベッドと寝室の両方を含む最初の行（bedroom は単独で両方を満たす。大文字小文字は区別しない）
+_SUBTITLE_LINE_PATTERN = re.compile(r"[^\n]*(?:bedroom|(?:ベッド|bed)[^\n]*寝室|寝室[^\n]*(?:ベッド|bed))[^\n]*", re.IGNORECASE)
+_XPATHS_SUBTITLE_CANDIDATES = (
+    ".//*[contains(@data-testid, 'subtitle')]",
+    ".//*[contains(@data-testid, 'listing-card')][contains(@data-testid, 'caption')]",
+    ".//div[contains(@class, 'subtitle')] | .//span[contains(@class, 'subtitle')]",
+)
+_XPATH_NAME = ".//span[@data-testid='listing-card-name'] | .//div[@data-testid='listing-card-name']"
+_XPATHS_TITLE = (
+    ".//div[@data-testid='listing-card-title']",
+    ".//span[@data-testid='listing-card-title']",
+    ".//a[@data-testid='listing-card-title']",
+    ".//*[@data-testid='listing-card-title']",
+)
+_XPATH_META_NAME = ".//meta[@itemprop='name']"
+_XPATH_TITLE_CANDIDATES = (
+    ".//div[contains(@data-testid, 'title')] | "
+    ".//span[contains(@data-testid, 'title')] | "
+    ".//a[contains(@data-testid, 'title')] | "
+    ".//*[contains(@data-testid, 'title')] | "
+    ".//h1 | .//h2 | .//h3 | "
+    ".//div[contains(@class, 'title')] | "
+    ".//span[contains(@class, 'title')] | "
+    ".//a[contains(@href, '/rooms/')] | "
+    ".//div[@role='link']"
+)
+_XPATH_TITLE_PARENT = "./ancestor::*[self::div or self::article or self::section][1]"
+# 価格 span の親カード（最も近い card-container は JS の closest で探し、無ければ以下の XPath を順に試す）
+_CSS_CARD_CONTAINER = '[data-testid="card-container"]'
+_XPATHS_SPAN_CONTAINER = (
+    "./ancestor::*[self::div or self::article][.//span[@aria-label and (contains(@aria-label,'（1泊）') or contains(@aria-label,'1泊') or contains(@aria-label,'/泊'))]][1]",
+    "./ancestor::*[self::div or self::article][1]",
+)
+_XPATH_CARD_LINK = ".//a[contains(@href,'/rooms/')][1]"
+_XPATH_SPAN_LINK_FALLBACK = "./ancestor::*[.//a[contains(@href,'/rooms/')]][1]//a[contains(@href,'/rooms/')][1]"
+_XPATHS_ANCHOR_CONTAINER = (
+    "./ancestor::*[@data-testid='card-container' or (self::div or self::article)][.//span[@aria-label and (contains(@aria-label,'（1泊）') or contains(@aria-label,'1泊') or contains(@aria-label,'/泊'))]][1]",
+    "./ancestor::*[self::div or self::article][.//span[@aria-label and (contains(@aria-label,'（1泊）') or contains(@aria-label,'1泊') or contains(@aria-label,'/泊'))]][1]",
+)
 
-# ページ全体の価格 span の XPath
+_SNAPSHOT_XPATHS = {
+    "price_span": price_span_css(),
+    "listing_anchors": listing_anchors_css(),
+    "card_candidates": card_candidates_css(),
+    "details_link": _XPATH_DETAILS_LINK,
+    "guests": _XPATH_GUESTS,
+    "long_titles": list(_XPATHS_LONG_TITLE),
+    "subtitle": _XPATH_SUBTITLE,
+    "bedrooms": _XPATH_BEDROOMS,
+    "beds": _XPATH_BEDS,
+    "price_row": _XPATH_PRICE_ROW,
+    "rating_spans": _XPATH_RATING_SPANS,
+    "ratings": _XPATH_RATINGS,
+    "subtitle_candidates": list(_XPATHS_SUBTITLE_CANDIDATES),
+    "name": _XPATH_NAME,
+    "titles": list(_XPATHS_TITLE),
+    "meta_name": _XPATH_META_NAME,
+    "title_candidates": _XPATH_TITLE_CANDIDATES,
+    "title_parent": _XPATH_TITLE_PARENT,
+    "card_container": _CSS_CARD_CONTAINER,
+    "span_containers": list(_XPATHS_SPAN_CONTAINER),
+    "card_link": _XPATH_CARD_LINK,
+    "span_link_fallback": _XPATH_SPAN_LINK_FALLBACK,
+    "anchor_containers": list(_XPATHS_ANCHOR_CONTAINER),
+}
+
+# ページ内の価格 span・リンク・カードの情報を1回の実行でまとめて返す JS
+# （arguments[0]: _SNAPSHOT_XPATHS（CSS セレクタを含む）, arguments[1]: "spans" / "anchors" / "cards"）
+# text() は Selenium の WebElement.text と同じ規則で表示テキストを組み立てる
+_PAGE_SNAPSHOT_JS = r"""
+const X = arguments[0], mode = arguments[1];
+const INLINE_BOXES = ["inline", "inline-block", "inline-table", "none", "table-cell", "table-column", "table-column-group"];
+const memo = new Map();
+function textLines(el, lines) {
+  const cur = () => lines[lines.length - 1] || "";
+  if (el.tagName === "BR") { lines.push(""); return; }
+  const cs = getComputedStyle(el);
+  const isTD = el.tagName === "TD";
+  const display = cs.display;
+  const isBlock = !isTD && !INLINE_BOXES.includes(display);
+  const prev = el.previousElementSibling;
+  const runIn = prev && getComputedStyle(prev).display === "run-in" && cs.cssFloat === "none";
+  if (isBlock && !runIn && !/^[\s\u200b]*$/.test(cur())) lines.push("");
+  const shown = el.checkVisibility({visibilityProperty: true, opacityProperty: true});
+  const ws = shown ? cs.whiteSpace : null;
+  const tt = shown ? cs.textTransform : null;
+  for (const n of el.childNodes) {
+    if (n.nodeType === 3 && shown) {
+      let t = n.nodeValue.replace(/[\u200b\u200e\u200f]/g, "").replace(/\r\n|\r/g, "\n");
+      if (ws === "normal" || ws === "nowrap") t = t.replace(/\n/g, " ");
+      if (ws === "pre" || ws === "pre-wrap") t = t.replace(/[ \f\t\v\u2028\u2029]/g, "\xa0");
+      else t = t.replace(/[ \f\t\v\u2028\u2029]+/g, " ");
+      if (tt === "uppercase") t = t.toUpperCase();
+      else if (tt === "lowercase") t = t.toLowerCase();
+      const c = lines.pop() || "";
+      if (c.endsWith(" ") && t.startsWith(" ")) t = t.substr(1);
+      lines.push(c + t);
+    } else if (n.nodeType === 1) {
+      textLines(n, lines);
+    }
+  }
+  const line = cur();
+  if ((isTD || display === "table-cell") && line && !line.endsWith(" ")) lines[lines.length - 1] += " ";
+  if (isBlock && display !== "run-in" && !/^[\s\u200b]*$/.test(line)) lines.push("");
+}
+function text(el) {
+  if (memo.has(el)) return memo.get(el);
+  const lines = [""];
+  textLines(el, lines);
+  const trim = s => s.replace(/^[^\S\xa0]+|[^\S\xa0]+$/g, "");
+  const t = trim(lines.map(trim).join("\n")).replace(/\xa0/g, " ");
+  memo.set(el, t);
+  return t;
+}
+function anyText(el) { return text(el) || el.innerText || el.textContent || ""; }
+function attr(el, name) { return el.getAttribute(name) || ""; }
+function first(ctx, xp) {
+  return document.evaluate(xp, ctx, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+}
+function firstOf(ctx, xps) {
+  for (const xp of xps) { const el = first(ctx, xp); if (el) return el; }
+  return null;
+}
+function all(ctx, xp) {
+  const r = document.evaluate(xp, ctx, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+  const out = [];
+  for (let i = 0; i < r.snapshotLength; i++) out.push(r.snapshotItem(i));
+  return out;
+}
+function css(ctx, sel) { return Array.from(ctx.querySelectorAll(sel)); }
+function textAndAria(ctx, xp) { return all(ctx, xp).map(e => [text(e), attr(e, "aria-label")]); }
+function titleOf(el) {
+  const titleEl = firstOf(el, X.titles);
+  const meta = first(el, X.meta_name);
+  const parent = first(el, X.title_parent);
+  return {
+    names: all(el, X.name).map(text),
+    title: titleEl ? anyText(titleEl) : null,
+    aria: attr(el, "aria-label"),
+    title_attr: typeof el.title === "string" ? el.title : attr(el, "title"),
+    meta_name: meta ? (meta.content || "") : null,
+    candidates: all(el, X.title_candidates).map(anyText),
+    parent: parent ? text(parent) : null,
+  };
+}
+function detailsOf(c) {
+  const link = first(c, X.details_link);
+  const priceRow = first(c, X.price_row);
+  const subtitle = first(c, X.subtitle);
+  return {
+    text: text(c),
+    link: link ? (link.href || link.content || "") : null,
+    guests: textAndAria(c, X.guests),
+    long_titles: X.long_titles.map(xp => { const el = first(c, xp); return el ? (text(el) || el.innerText || "") : null; }),
+    subtitle: subtitle ? text(subtitle) : null,
+    bedrooms: textAndAria(c, X.bedrooms),
+    beds: textAndAria(c, X.beds),
+    price_row: priceRow ? anyText(priceRow) : null,
+    rating_spans: priceRow ? all(priceRow, X.rating_spans).map(anyText) : [],
+    ratings: all(c, X.ratings).map(e => [attr(e, "aria-label"), text(e)]),
+    subtitle_candidates: X.subtitle_candidates.map(xp => all(c, xp).map(text)),
+  };
+}
+const cards = [], cardIndex = new Map();
+function register(c, build) {
+  if (!c) return null;
+  if (!cardIndex.has(c)) { cardIndex.set(c, cards.length); cards.push(build(c)); }
+  return cardIndex.get(c);
+}
+if (mode === "spans") {
+  const items = css(document, X.price_span).map(s => {
+    const p = s.parentElement;
+    const c = (p && p.closest(X.card_container)) || firstOf(s, X.span_containers);
+    let href = null;
+    if (c) {
+      const a = first(c, X.card_link) || first(s, X.span_link_fallback);
+      href = a ? (a.href || "") : null;
+    }
+    const card = register(c, el => {
+      const a = first(el, X.card_link);
+      return {title: titleOf(el), link_title: a ? titleOf(a) : null, details: detailsOf(el)};
+    });
+    return {label: attr(s, "aria-label"), text: text(s), card: card, href: href};
+  });
+  return {items: items, cards: cards};
+}
+if (mode === "anchors") {
+  const items = css(document, X.listing_anchors).map(a => ({
+    text: text(a),
+    href: a.href || "",
+    title: titleOf(a),
+    card: register(firstOf(a, X.anchor_containers), el => ({
+      spans: css(el, X.price_span).map(s => [attr(s, "aria-label"), text(s)]),
+      text: text(el),
+      title: titleOf(el),
+      details: detailsOf(el),
+    })),
+  }));
+  return {items: items, cards: cards};
+}
+const items = css(document, X.card_candidates).map(c => ({text: text(c), title: titleOf(c), details: detailsOf(c)}));
+return {items: items, cards: cards};
+"""
+
+
+# 検索結果ページの価格 span・リンク・カード情報を1回の execute_script でまとめて取得
 #
 # 引数:
-#   （なし）
+#   driver: Selenium WebDriver
+#   mode (str): "spans"（価格 span 起点）/ "anchors"（リンク起点）/ "cards"（カード候補起点）
 #
 # 戻り値:
-#   str: XPath 文字列
-def price_span_anywhere_xpath() -> str:
-    return (
-        '//span[@aria-label and ('
-        'contains(@aria-label, "（1泊）") or contains(@aria-label, "1泊") or contains(@aria-label, "/泊")'
-        ')]'
-    )
+#   Dict: items（起点要素ごとの情報）, cards（コンテナ情報。items の card が添字で参照）
+def _snapshot_page(driver, mode: str) -> Dict[str, list]:
+    try:
+        snapshot = driver.execute_script(_PAGE_SNAPSHOT_JS, _SNAPSHOT_XPATHS, mode)
+    except Exception:
+        snapshot = None
+    return snapshot or {"items": [], "cards": []}
 
 
-# コンテナから物件詳細（ゲスト数・寝室・ベッド・レビュー・評価・補足）を抽出
+# コンテナのスナップショットから物件詳細（ゲスト数・寝室・ベッド・レビュー・評価・補足）を抽出
 #
 # 引数:
-#   container: Selenium WebElement（カードコンテナ）
+#   container: _snapshot_page のカード詳細（detailsOf の戻り値）
 #
 # 戻り値:
 #   Dict: guests, bedrooms, beds, reviews_count, rating, subtitle
-def extract_listing_details_from_container(container) -> Dict[str, Optional[object]]:
+def extract_listing_details_from_container(container: Dict[str, object]) -> Dict[str, Optional[object]]:
     details = {
         "guests": None,
         "bedrooms": None,
@@ -102,131 +349,60 @@ def extract_listing_details_from_container(container) -> Dict[str, Optional[obje
         "subtitle": None,
     }
     try:
-        container_text = container.text or ""
-        container_html = container.get_attribute("innerHTML") or ""
+        container_text = container["text"] or ""
         # adults= を含む URL からゲスト数を取得
-        try:
-            href_elem = container.find_element(By.XPATH, ".//a[contains(@href, '/rooms/')] | .//meta[@itemprop='url']")
-            href = href_elem.get_attribute("href") or href_elem.get_attribute("content") or ""
-            if href and "adults=" in href:
-                adults_match = re.search(r'adults=(\d+)', href)
-                if adults_match:
-                    details["guests"] = int(adults_match.group(1))
-        except Exception:
-            pass
+        href = container["link"]
+        if href and "adults=" in href:
+            adults_match = _ADULTS_PATTERN.search(href)
+            if adults_match:
+                details["guests"] = int(adults_match.group(1))
 
         # DOM中の要素からゲスト数を探す
         if not details["guests"]:
-            try:
-                guest_elements = container.find_elements(By.XPATH,
-                    ".//span[contains(text(), '人') or contains(text(), 'guests') or contains(text(), '名')] | "
-                    ".//div[contains(text(), '人') or contains(text(), 'guests') or contains(text(), '名')] | "
-                    ".//span[contains(@aria-label, '人') or contains(@aria-label, 'guests') or contains(@aria-label, '名')] | "
-                    ".//div[contains(@aria-label, '人') or contains(@aria-label, 'guests')] | "
-                    ".//span[contains(@data-testid, 'guest')] | "
-                    ".//div[contains(@data-testid, 'guest')]"
-                )
-                # 候補要素を順に解析して最初に見つかった値を採用
-                for elem in guest_elements:
-                    elem_text = elem.text or ""
-                    aria_label = elem.get_attribute("aria-label") or ""
-                    if not details["guests"]:
-                        details["guests"] = pick_guests_from_text(elem_text) or pick_guests_from_text(aria_label)
-            except Exception:
-                pass
+            # 候補要素を順に解析して最初に見つかった値を採用
+            for elem_text, aria_label in container["guests"]:
+                if not details["guests"]:
+                    details["guests"] = pick_guests_from_text(elem_text) or pick_guests_from_text(aria_label)
             if not details["guests"]:
-                details["guests"] = pick_guests_from_text(container_text) or pick_guests_from_text(container_html)
+                details["guests"] = pick_guests_from_text(container_text)
 
         # サブタイトル行から寝室数を取得（優先）
         # 補足情報: listing-card-title の長い説明文（例: 【囲炉裏&プライベートサウナ】IRORI BY LUGSTAY…）を優先
-        try:
-            for xpath in (
-                ".//div[@data-testid='listing-card-title']",
-                ".//span[@data-testid='listing-card-title']",
-                ".//a[@data-testid='listing-card-title']",
-            ):
-                try:
-                    title_elem = container.find_element(By.XPATH, xpath)
-                    long_desc = (title_elem.text or title_elem.get_attribute("innerText") or "").strip()
-                    if long_desc and len(long_desc) > 20:
-                        details["subtitle"] = long_desc
-                        break
-                except Exception:
-                    continue
-        except Exception:
-            pass
-
-        try:
-            subtitle_elem = container.find_element(By.XPATH, ".//div[@data-testid='listing-card-subtitle'] | .//span[@data-testid='listing-card-subtitle']")
-            subtitle_text = subtitle_elem.text or ""
-            if subtitle_text:
-                details["bedrooms"] = pick_bedrooms_from_text(subtitle_text)
-                # 補足が未設定のときのみ listing-card-subtitle（寝室・ベッド等）を補足に使う
-                if not details["subtitle"]:
-                    details["subtitle"] = subtitle_text.strip()
-        except Exception:
-            pass
+        for long_desc in container["long_titles"]:
+            long_desc = (long_desc or "").strip()
+            if long_desc and len(long_desc) > 20:
+                details["subtitle"] = long_desc
+                break
+
+        subtitle_text = container["subtitle"] or ""
+        if subtitle_text:
+            details["bedrooms"] = pick_bedrooms_from_text(subtitle_text)
+            # 補足が未設定のときのみ listing-card-subtitle（寝室・ベッド等）を補足に使う
+            if not details["subtitle"]:
+                details["subtitle"] = subtitle_text.strip()
 
         # 寝室数を複数候補から抽出
         if not details["bedrooms"]:
-            try:
-                bedroom_elements = container.find_elements(By.XPATH,
-                    ".//span[contains(text(), '寝室') or contains(text(), 'bedroom') or contains(text(), 'BR')] | "
-                    ".//div[contains(text(), '寝室') or contains(text(), 'bedroom') or contains(text(), 'BR')] | "
-                    ".//span[contains(@aria-label, '寝室') or contains(@aria-label, 'bedroom')] | "
-                    ".//div[contains(@aria-label, '寝室') or contains(@aria-label, 'bedroom')] | "
-                    ".//span[contains(@data-testid, 'bedroom')] | "
-                    ".//div[contains(@data-testid, 'bedroom')]"
-                )
-                for elem in bedroom_elements:
-                    elem_text = elem.text or ""
-                    aria_label = elem.get_attribute("aria-label") or ""
-                    if not details["bedrooms"]:
-                        details["bedrooms"] = pick_bedrooms_from_text(elem_text) or pick_bedrooms_from_text(aria_label)
-            except Exception:
-                pass
+            for elem_text, aria_label in container["bedrooms"]:
+                if not details["bedrooms"]:
+                    details["bedrooms"] = pick_bedrooms_from_text(elem_text) or pick_bedrooms_from_text(aria_label)
             if not details["bedrooms"]:
-                details["bedrooms"] = pick_bedrooms_from_text(container_text) or pick_bedrooms_from_text(container_html)
+                details["bedrooms"] = pick_bedrooms_from_text(container_text)
 
-        try:
-            subtitle_elem = container.find_element(By.XPATH, ".//div[@data-testid='listing-card-subtitle'] | .//span[@data-testid='listing-card-subtitle']")
-            subtitle_text = subtitle_elem.text or ""
-            if subtitle_text:
-                details["beds"] = pick_beds_from_text(subtitle_text)
-                if not details["subtitle"]:
-                    details["subtitle"] = subtitle_text.strip()
-        except Exception:
-            pass
+        if subtitle_text:
+            details["beds"] = pick_beds_from_text(subtitle_text)
 
         # ベッド数を候補要素やテキストから抽出
         if not details["beds"]:
-            try:
-                bed_elements = container.find_elements(By.XPATH,
-                    ".//span[contains(text(), 'ベッド')] | "
-                    ".//span[contains(text(), 'bed') and not(contains(text(), 'bedroom'))] | "
-                    ".//div[contains(text(), 'ベッド')] | "
-                    ".//div[contains(text(), 'bed') and not(contains(text(), 'bedroom'))] | "
-                    ".//span[contains(@aria-label, 'ベッド')] | "
-                    ".//span[contains(@aria-label, 'bed') and not(contains(@aria-label, 'bedroom'))] | "
-                    ".//div[contains(@aria-label, 'ベッド')] | "
-                    ".//div[contains(@aria-label, 'bed') and not(contains(@aria-label, 'bedroom'))] | "
-                    ".//span[contains(@data-testid, 'bed') and not(contains(@data-testid, 'bedroom'))] | "
-                    ".//div[contains(@data-testid, 'bed') and not(contains(@data-testid, 'bedroom'))]"
-                )
-                for elem in bed_elements:
-                    elem_text = elem.text or ""
-                    aria_label = elem.get_attribute("aria-label") or ""
-                    if not details["beds"]:
-                        details["beds"] = pick_beds_from_text(elem_text) or pick_beds_from_text(aria_label)
-            except Exception:
-                pass
+            for elem_text, aria_label in container["beds"]:
+                if not details["beds"]:
+                    details["beds"] = pick_beds_from_text(elem_text) or pick_beds_from_text(aria_label)
             if not details["beds"]:
-                details["beds"] = pick_beds_from_text(container_text) or pick_beds_from_text(container_html)
+                details["beds"] = pick_beds_from_text(container_text)
 
         # 価格行からレビュー件数・評価を試しに抽出
         try:
-            price_row = container.find_element(By.XPATH, ".//div[@data-testid='price-availability-row']")
-            price_row_text = price_row.text or price_row.get_attribute("innerText") or price_row.get_attribute("textContent") or ""
+            price_row_text = container["price_row"]
             if price_row_text:
                 details["reviews_count"] = pick_reviews_count_from_text(price_row_text)
                 if not details["rating"]:
@@ -234,14 +410,11 @@ def extract_listing_details_from_container(container) -> Dict[str, Optional[obje
         except Exception:
             pass
         if not details["reviews_count"]:
-            details["reviews_count"] = pick_reviews_count_from_text(container_text) or pick_reviews_count_from_text(container_html)
+            details["reviews_count"] = pick_reviews_count_from_text(container_text)
 
         if not details["rating"]:
             try:
-                price_row = container.find_element(By.XPATH, ".//div[@data-testid='price-availability-row']")
-                rating_spans = price_row.find_elements(By.XPATH, ".//span[@aria-hidden='true'] | .//span[contains(text(), '★') or contains(text(), '⭐')]")
-                for span in rating_spans:
-                    span_text = span.text or span.get_attribute("innerText") or span.get_attribute("textContent") or ""
+                for span_text in container["rating_spans"]:
                     if not details["rating"]:
                         details["rating"] = pick_rating_from_text(span_text)
                     if not details["reviews_count"]:
@@ -251,203 +424,151 @@ def extract_listing_details_from_container(container) -> Dict[str, Optional[obje
 
         if not details["rating"]:
             try:
-                rating_elements = container.find_elements(By.XPATH,
-                    ".//span[contains(@aria-label, '星') or contains(@aria-label, 'star') or contains(@aria-label, 'rating')] | "
-                    ".//div[contains(@data-testid, 'rating') or contains(@aria-label, 'rating') or contains(@aria-label, 'star')] | "
-                    ".//span[contains(@data-testid, 'rating') or contains(@data-testid, 'star')] | "
-                    ".//span[contains(text(), '★') or contains(text(), '⭐')] | "
-                    ".//div[contains(text(), '★') or contains(text(), '⭐')] | "
-                    ".//span[contains(@class, 'rating') or contains(@class, 'star')] | "
-                    ".//div[contains(@class, 'rating') or contains(@class, 'star')]"
-                )
-                for elem in rating_elements:
-                    aria_label = elem.get_attribute("aria-label") or ""
-                    elem_text = elem.text or ""
+                for aria_label, elem_text in container["ratings"]:
                     if not details["rating"]:
                         details["rating"] = pick_rating_from_text(aria_label) or pick_rating_from_text(elem_text)
             except Exception:
                 pass
             if not details["rating"]:
-                details["rating"] = pick_rating_from_text(container_text) or pick_rating_from_text(container_html)
-
-        if not details["rating"]:
-            rating_candidates = []
-            rating_matches = re.findall(r'\b([1-5](?:\.\d+)?)\b', container_text)
-            for match in rating_matches:
-                try:
-                    val = float(match)
-                    if 0 < val <= 5.0:
-                        rating_candidates.append(val)
-                except ValueError:
-                    pass
-            if rating_candidates:
-                details["rating"] = max(rating_candidates)
-            else:
-                details["rating"] = pick_rating_from_text(container_text) or pick_rating_from_text(container_html)
-
-        try:
-            subtitle_elem = container.find_element(By.XPATH, ".//div[@data-testid='listing-card-subtitle'] | .//span[@data-testid='listing-card-subtitle']")
-            subtitle_text = subtitle_elem.text or ""
-            if subtitle_text and not details["subtitle"]:
-                details["subtitle"] = subtitle_text.strip()
-        except Exception:
-            pass
+                details["rating"] = pick_rating_from_text(container_text)
 
         # listing-card-subtitle が見つからない場合、subtitle 系の要素を広く探す
         if not details["subtitle"]:
-            try:
-                for xpath in (
-                    ".//*[contains(@data-testid, 'subtitle')]",
-                    ".//*[contains(@data-testid, 'listing-card')][contains(@data-testid, 'caption')]",
-                    ".//div[contains(@class, 'subtitle')] | .//span[contains(@class, 'subtitle')]",
-                ):
-                    elems = container.find_elements(By.XPATH, xpath)
-                    for e in elems:
-                        t = (e.text or "").strip()
-                        if t and len(t) > 2 and len(t) < 120 and ("寝室" in t or "ベッド" in t or "·" in t or "bedroom" in t.lower()):
-                            details["subtitle"] = t
-                            break
-                    if details["subtitle"]:
+            for texts in container["subtitle_candidates"]:
+                for t in texts:
+                    t = t.strip()
+                    if t and len(t) > 2 and len(t) < 120 and ("寝室" in t or "ベッド" in t or "·" in t or "bedroom" in t.lower()):
+                        details["subtitle"] = t
                         break
-            except Exception:
-                pass
+                if details["subtitle"]:
+                    break
 
         if not details["subtitle"]:
-            lines = container_text.split("\n")
-            for line in lines:
-                line = line.strip()
-                # 寝室・ベッド・バスルーム等を含む行を補足情報とする
-                if (
-                    ("ベッド" in line or "bed" in line.lower())
-                    and ("寝室" in line or "bedroom" in line.lower())
-                ):
-                    details["subtitle"] = line
-                    break
-            if not details["subtitle"]:
+            # 寝室・ベッド・バスルーム等を含む行を補足情報とする（行ごとに分割せず1回の検索で最初の行を探す）
+            line_match = _SUBTITLE_LINE_PATTERN.search(container_text)
+            if line_match:
+                details["subtitle"] = line_match.group(0).strip()
+            else:
+                lines = container_text.split("\n")
                 # 「·」区切りの行（例: 寝室3部屋 · ベッド5台）を優先
                 for line in lines:
                     line = line.strip()
                     if line and "·" in line and ("寝室" in line or "ベッド" in line or "bedroom" in line.lower()):
                         details["subtitle"] = line
                         break
-            if not details["subtitle"]:
-                for line in lines:
-                    line = line.strip()
-                    # 寝室 or ベッド or バスルームを含む短めの行（長いタイトルと区別するため50文字以下）
-                    if line and len(line) <= 50 and (
-                        "寝室" in line or "ベッド" in line or "バスルーム" in line
-                        or "bedroom" in line.lower() or "bath" in line.lower()
-                    ):
-                        details["subtitle"] = line
-                        break
+                if not details["subtitle"]:
+                    for line in lines:
+                        line = line.strip()
+                        # 寝室 or ベッド or バスルームを含む短めの行（長いタイトルと区別するため50文字以下）
+                        if line and len(line) <= 50 and (
+                            "寝室" in line or "ベッド" in line or "バスルーム" in line
+                            or "bedroom" in line.lower() or "bath" in line.lower()
+                        ):
+                            details["subtitle"] = line
+                            break
     except Exception:
         pass
     return details
 
 
-# 要素からタイトル（物件名）を抽出
+# 要素のスナップショットからタイトル（物件名）を抽出
 #
 # 引数:
-#   elem: Selenium WebElement
+#   elem: _snapshot_page のタイトル候補（titleOf の戻り値）
 #
 # 戻り値:
 #   str: 物件名（取得不可時は空文字）
-def extract_title_from_element(elem) -> str:
+def extract_title_from_element(elem: Dict[str, object]) -> str:
     """要素から物件タイトルと思われるテキストを抽出して返す"""
-    try:
-        # まずは data-testid の名前候補を探す
-        name_elems = elem.find_elements(By.XPATH, ".//span[@data-testid='listing-card-name'] | .//div[@data-testid='listing-card-name']")
-        for name_elem in name_elems:
-            name_text = name_elem.text or ""
-            if name_text and len(name_text) > 5:
-                return name_text.strip()
-    except Exception:
-        pass
-
-    try:
-        # タイトル候補のXPathを順に試す
-        title_elem = None
-        xpaths = [
-            ".//div[@data-testid='listing-card-title']",
-            ".//span[@data-testid='listing-card-title']",
-            ".//a[@data-testid='listing-card-title']",
-            ".//*[@data-testid='listing-card-title']",
-        ]
-        for xpath in xpaths:
-            try:
-                title_elem = elem.find_element(By.XPATH, xpath)
-                if title_elem:
-                    break
-            except Exception:
-                continue
+    # まずは data-testid の名前候補を探す
+    for name_text in elem["names"]:
+        if name_text and len(name_text) > 5:
+            return name_text.strip()
+
+    # タイトル候補のXPathを順に試した最初の要素
+    title_text = elem["title"]
+    if title_text and len(title_text.strip()) > 0:
+        title_text = title_text.strip()
+        # 短いタイトル（例: 大阪市の一軒家）のみタイトルとする。長い説明文は補足として別途取得する
+        if len(title_text) >= 3 and len(title_text) <= 35:
+            return title_text
+
+    # aria-labelにタイトル風の文字列があれば返す
+    aria_label = elem["aria"]
+    if aria_label and len(aria_label) > 5:
+        if "（1泊）" not in aria_label and "¥" not in aria_label and "1泊" not in aria_label:
+            return aria_label.strip()
+
+    # title属性にまともな文字列があれば返す
+    title_attr = elem["title_attr"]
+    if title_attr and len(title_attr) > 5 and "¥" not in title_attr and "1泊" not in title_attr:
+        return title_attr.strip()
+
+    # meta要素のitemprop=nameから取得
+    meta_content = elem["meta_name"] or ""
+    if meta_content and len(meta_content) > 5:
+        return meta_content.strip()
+
+    # 各種タイトル候補要素を順に見て短すぎたり価格表記でないものを返す
+    for title_text in elem["candidates"]:
+        if title_text:
+            title_text = title_text.strip()
+            if len(title_text) >= 3 and len(title_text) <= 35 and "¥" not in title_text and "1泊" not in title_text and "（1泊）" not in title_text:
+                return title_text
+
+    if elem["parent"] is not None:
+        lines = [line.strip() for line in elem["parent"].split("\n") if line.strip()]
+        for line in lines:
+            if len(line) > 10 and "¥" not in line and "名" not in line and "guests" not in line.lower() and "1泊" not in line:
+                return line
+    return ""
 
-        if title_elem:
-            title_text = title_elem.text or title_elem.get_attribute("innerText") or title_elem.get_attribute("textContent") or ""
-            if title_text and len(title_text.strip()) > 0:
-                title_text = title_text.strip()
-                # 短いタイトル（例: 大阪市の一軒家）のみタイトルとする。長い説明文は補足として別途取得する
-                if len(title_text) >= 3 and len(title_text) <= 35:
-                    return title_text
-    except Exception:
-        pass
 
-    try:
-        # aria-labelにタイトル風の文字列があれば返す
-        aria_label = elem.get_attribute("aria-label") or ""
-        if aria_label and len(aria_label) > 5:
-            if "（1泊）" not in aria_label and "¥" not in aria_label and "1泊" not in aria_label:
-                return aria_label.strip()
-    except Exception:
-        pass
+# カードの詳細を解析する（解析済みのカードは前回の結果を返す）
+#
+# 引数:
+#   memo (Dict): スナップショット内のカード番号 → 解析結果（呼び出し側で1ページ分保持）
+#   card_index (int): スナップショット内のカード番号
+#   container (Dict): _snapshot_page のカード情報
+#
+# 戻り値:
+#   Dict: extract_listing_details_from_container の戻り値
+def _memoized_listing_details(
+    memo: Dict[int, Dict[str, Optional[object]]], card_index: int, container: Dict[str, object]
+) -> Dict[str, Optional[object]]:
+    listing_details = memo.get(card_index)
+    if listing_details is None:
+        listing_details = memo[card_index] = extract_listing_details_from_container(container["details"])
+    return listing_details
 
-    try:
-        # title属性にまともな文字列があれば返す
-        title_attr = elem.get_attribute("title") or ""
-        if title_attr and len(title_attr) > 5 and "¥" not in title_attr and "1泊" not in title_attr:
-            return title_attr.strip()
-    except Exception:
-        pass
 
-    try:
-        # meta要素のitemprop=nameから取得
-        meta_elem = elem.find_element(By.XPATH, ".//meta[@itemprop='name']")
-        meta_content = meta_elem.get_attribute("content") or ""
-        if meta_content and len(meta_content) > 5:
-            return meta_content.strip()
-    except Exception:
-        pass
+# 採用する価格の範囲 [下限, 上限) を求める（PRICE_MIN 未満・閾値以上は除外。ループの外で1回だけ求める）
+#
+# 引数:
+#   checkin_date (date): 対象日
+#   price_threshold (int or None): 前計算済みの価格閾値（None なら対象日から求める）
+#
+# 戻り値:
+#   Tuple[int, int]: (下限, 上限)。PRICE_MIN が None なら下限は 0
+def _price_bounds(checkin_date: date, price_threshold: Optional[int]) -> Tuple[int, int]:
+    if price_threshold is None:
+        price_threshold = get_price_threshold(checkin_date)
+    return (PRICE_MIN if PRICE_MIN is not None else 0), price_threshold
 
-    try:
-        # 各種タイトル候補要素を順に見て短すぎたり価格表記でないものを返す
-        title_elems = elem.find_elements(By.XPATH,
-            ".//div[contains(@data-testid, 'title')] | "
-            ".//span[contains(@data-testid, 'title')] | "
-            ".//a[contains(@data-testid, 'title')] | "
-            ".//*[contains(@data-testid, 'title')] | "
-            ".//h1 | .//h2 | .//h3 | "
-            ".//div[contains(@class, 'title')] | "
-            ".//span[contains(@class, 'title')] | "
-            ".//a[contains(@href, '/rooms/')] | "
-            ".//div[@role='link']"
-        )
-        for title_elem in title_elems:
-            title_text = title_elem.text or title_elem.get_attribute("innerText") or title_elem.get_attribute("textContent") or ""
-            if title_text:
-                title_text = title_text.strip()
-                if len(title_text) >= 3 and len(title_text) <= 35 and "¥" not in title_text and "1泊" not in title_text and "（1泊）" not in title_text:
-                    return title_text
-    except Exception:
-        pass
 
-    try:
-        parent = elem.find_element(By.XPATH, "./ancestor::*[self::div or self::article or self::section][1]")
-        lines = [line.strip() for line in parent.text.split("\n") if line.strip()]
-        for line in lines:
-            if len(line) > 10 and "¥" not in line and "名" not in line and "guests" not in line.lower() and "1泊" not in line:
-                return line
-    except Exception:
-        pass
-    return ""
+# 評価・レビュー件数のフィルタ（RATING_MIN以下・REVIEWS_COUNT_MIN未満は除外。取得できなかった値は判定しない）
+#
+# 引数:
+#   listing_details (Dict): extract_listing_details_from_container の戻り値
+#
+# 戻り値:
+#   bool: True なら除外
+def _is_excluded_by_reviews(listing_details: Dict[str, Optional[object]]) -> bool:
+    rating = listing_details.get("rating")
+    if rating is not None and rating <= RATING_MIN:
+        return True
+    reviews_count = listing_details.get("reviews_count")
+    return reviews_count is not None and reviews_count < REVIEWS_COUNT_MIN
 
 
 # 検索結果ページから価格・URL・タイトル・レビュー等を1件ずつ抽出。閾値超過・RATING_MIN以下・REVIEWS_COUNT_MIN未満は除外
@@ -455,88 +576,44 @@ def extract_title_from_element(elem) -> str:
 # 引数:
 #   driver: Selenium WebDriver
 #   checkin_date (date): 対象日
+#   price_threshold (int or None): 前計算済みの価格閾値（None なら対象日から求める）
 #
 # 戻り値:
 #   List[Dict]: 各件の price_yen, listing_url, title, guests, bedrooms 等
-def extract_price_details_from_cards(driver, checkin_date: date) -> List[Dict[str, object]]:
+def extract_price_details_from_cards(driver, checkin_date: date, price_threshold: Optional[int] = None) -> List[Dict[str, object]]:
     """検索結果ページから価格・URL・タイトル・レビュー等を1件ずつ抽出"""
     # 日付に応じた閾値（閾値超過は除外）
-    price_threshold = get_price_threshold(checkin_date)
-    spans = driver.find_elements(By.XPATH, price_span_anywhere_xpath())
+    price_lower, price_upper = _price_bounds(checkin_date, price_threshold)
+    snapshot = _snapshot_page(driver, "spans")
+    spans = snapshot["items"]
+    containers = snapshot["cards"]
+    # 同じカードを指す価格要素・リンクが複数あっても詳細の解析はカードごとに1回
+    details_memo: Dict[int, Dict[str, Optional[object]]] = {}
     if spans:
         # aria-label や text から価格を取得。閾値超過・RATING_MIN以下・REVIEWS_COUNT_MIN未満はスキップ
         by_href: Dict[str, Dict[str, object]] = {}
         loose: List[Dict[str, object]] = []
         # 各spanについて価格やタイトル等を解析
         for idx, s in enumerate(spans):
-            label = s.get_attribute("aria-label") or ""
-            p = pick_price_from_text(label) or pick_price_from_text(s.text)
-            if p is None:
-                continue
-            if PRICE_MIN is not None and p < PRICE_MIN:
-                continue
-            if p >= price_threshold:
+            label = s["label"]
+            p = pick_price_from_text(label) or pick_price_from_text(s["text"])
+            if p is None or not price_lower <= p < price_upper:
                 continue
 
-            # 親コンテナから URL・タイトル・詳細を取得
+            # 親コンテナから URL・タイトル・詳細を取得（コンテナが無ければ URL・詳細なし）
             href = None
             title = ""
             listing_details = {}
-            try:
-                try:
-                    container = s.find_element(By.XPATH, "./ancestor::*[@data-testid='card-container'][1]")
-                except Exception:
-                    try:
-                        container = s.find_element(By.XPATH, "./ancestor::*[self::div or self::article][.//span[@aria-label and (contains(@aria-label,'（1泊）') or contains(@aria-label,'1泊') or contains(@aria-label,'/泊'))]][1]")
-                    except Exception:
-                        container = s.find_element(By.XPATH, "./ancestor::*[self::div or self::article][1]")
-
-                try:
-                    a = container.find_element(By.XPATH, ".//a[contains(@href,'/rooms/')][1]")
-                    href = a.get_attribute("href") or ""
-                except Exception:
-                    try:
-                        a = s.find_element(By.XPATH, "./ancestor::*[.//a[contains(@href,'/rooms/')]][1]//a[contains(@href,'/rooms/')][1]")
-                        href = a.get_attribute("href") or ""
-                    except Exception:
-                        href = None
-
-                title = extract_title_from_element(container)
-                if not title and href:
-                    try:
-                        a = container.find_element(By.XPATH, ".//a[contains(@href,'/rooms/')][1]")
-                        title = extract_title_from_element(a)
-                    except Exception:
-                        pass
-
-                listing_details = extract_listing_details_from_container(container)
-                rating = listing_details.get("rating")
-                if rating is not None and rating <= RATING_MIN:
+            if s["card"] is not None:
+                container = containers[s["card"]]
+                href = s["href"]
+                title = extract_title_from_element(container["title"])
+                if not title and href and container["link_title"] is not None:
+                    title = extract_title_from_element(container["link_title"])
+
+                listing_details = _memoized_listing_details(details_memo, s["card"], container)
+                if _is_excluded_by_reviews(listing_details):
                     continue
-                reviews_count = listing_details.get("reviews_count")
-                if reviews_count is not None and reviews_count < REVIEWS_COUNT_MIN:
-                    continue
-            except Exception:
-                href = None
-                try:
-                    try:
-                        container = s.find_element(By.XPATH, "./ancestor::*[@data-testid='card-container'][1]")
-                    except Exception:
-                        try:
-                            container = s.find_element(By.XPATH, "./ancestor::*[self::div or self::article][.//span[@aria-label and (contains(@aria-label,'（1泊）') or contains(@aria-label,'1泊') or contains(@aria-label,'/泊'))]][1]")
-                        except Exception:
-                            container = s.find_element(By.XPATH, "./ancestor::*[self::div or self::article][1]")
-                    title = extract_title_from_element(container)
-                    listing_details = extract_listing_details_from_container(container)
-                    rating = listing_details.get("rating")
-                    if rating is not None and rating <= RATING_MIN:
-                        continue
-                    reviews_count = listing_details.get("reviews_count")
-                    if reviews_count is not None and reviews_count < REVIEWS_COUNT_MIN:
-                        continue
-                except Exception:
-                    title = ""
-                    listing_details = {}
 
             if href:
                 by_href[href] = {"listing_url": href, "price_yen": p, "raw_label": label, "title": title, **listing_details}
@@ -547,58 +624,49 @@ def extract_price_details_from_cards(driver, checkin_date: date) -> List[Dict[st
             return list(by_href.values()) + loose
 
     # spansで候補が得られなければリンクアンカーから抽出
-    anchors = driver.find_elements(By.XPATH, listing_anchors_xpath())
+    snapshot = _snapshot_page(driver, "anchors")
+    anchors = snapshot["items"]
+    containers = snapshot["cards"]
+    details_memo = {}
     by_href2: Dict[str, Dict[str, object]] = {}
     loose2: List[Dict[str, object]] = []
 
     if anchors:
         # リンクアンカーを順に解析して価格を抽出
         for idx, a in enumerate(anchors):
-            try:
-                try:
-                    container = a.find_element(By.XPATH, "./ancestor::*[@data-testid='card-container' or (self::div or self::article)][.//span[@aria-label and (contains(@aria-label,'（1泊）') or contains(@aria-label,'1泊') or contains(@aria-label,'/泊'))]][1]")
-                except Exception:
-                    container = a.find_element(By.XPATH, "./ancestor::*[self::div or self::article][.//span[@aria-label and (contains(@aria-label,'（1泊）') or contains(@aria-label,'1泊') or contains(@aria-label,'/泊'))]][1]")
-
-                spans = container.find_elements(By.XPATH, price_span_in_card_xpath())
+            if a["card"] is not None:
+                container = containers[a["card"]]
                 p = None
                 raw_label = ""
-                for s in spans:
-                    label = s.get_attribute("aria-label") or ""
+                for label, span_text in container["spans"]:
                     raw_label = label or raw_label
-                    p = pick_price_from_text(label) or pick_price_from_text(s.text)
+                    p = pick_price_from_text(label) or pick_price_from_text(span_text)
                     if p is not None:
                         break
 
                 if p is None:
-                    p = pick_price_from_text(container.text)
+                    p = pick_price_from_text(container["text"])
 
-                if p is not None and PRICE_MIN is not None and p < PRICE_MIN:
-                    continue
-                if p is not None and p >= price_threshold:
+                if p is not None and not price_lower <= p < price_upper:
                     continue
 
-                title = extract_title_from_element(container)
+                title = extract_title_from_element(container["title"])
                 if not title:
-                    title = extract_title_from_element(a)
+                    title = extract_title_from_element(a["title"])
 
-                listing_details = extract_listing_details_from_container(container)
-                rating = listing_details.get("rating")
-                if rating is not None and rating <= RATING_MIN:
-                    continue
-                reviews_count = listing_details.get("reviews_count")
-                if reviews_count is not None and reviews_count < REVIEWS_COUNT_MIN:
+                listing_details = _memoized_listing_details(details_memo, a["card"], container)
+                if _is_excluded_by_reviews(listing_details):
                     continue
-            except Exception:
-                p = pick_price_from_text(a.text)
+            else:
+                p = pick_price_from_text(a["text"])
                 raw_label = ""
-                title = extract_title_from_element(a)
+                title = extract_title_from_element(a["title"])
                 listing_details = {}
-                if p is not None and p >= price_threshold:
+                if p is not None and p >= price_upper:
                     continue
 
             if p is not None:
-                href = a.get_attribute("href") or ""
+                href = a["href"]
                 if href:
                     by_href2[href] = {"listing_url": href, "price_yen": p, "raw_label": raw_label, "title": title, **listing_details}
                 else:
@@ -606,23 +674,147 @@ def extract_price_details_from_cards(driver, checkin_date: date) -> List[Dict[st
         return list(by_href2.values()) + loose2
 
     # 最終手段: ページ内のカード候補から価格を抽出
-    cards = driver.find_elements(By.XPATH, card_candidates_xpath())
+    cards = _snapshot_page(driver, "cards")["items"]
     details: List[Dict[str, object]] = []
     # カード候補を順に解析して価格等を抽出
     for c in cards:
-        p = pick_price_from_text(c.text)
+        p = pick_price_from_text(c["text"])
         if p is not None:
-            if PRICE_MIN is not None and p < PRICE_MIN:
-                continue
-            if p >= price_threshold:
+            if not price_lower <= p < price_upper:
                 continue
-            title = extract_title_from_element(c)
-            listing_details = extract_listing_details_from_container(c)
-            rating = listing_details.get("rating")
-            if rating is not None and rating <= RATING_MIN:
-                continue
-            reviews_count = listing_details.get("reviews_count")
-            if reviews_count is not None and reviews_count < REVIEWS_COUNT_MIN:
+            title = extract_title_from_element(c["title"])
+            listing_details = extract_listing_details_from_container(c["details"])
+            if _is_excluded_by_reviews(listing_details):
                 continue
             details.append({"listing_url": "", "price_yen": p, "raw_label": "", "title": title, **listing_details})
     return details
+
+
+# 検索結果の埋め込み JSON（ページ初期表示時に全件分の検索結果を含む script 要素）の本文を返す JS
+_DEFERRED_STATE_JS = (
+    "const el = document.querySelector('script[id^=\"data-deferred-state\"]');"
+    " return el ? el.textContent : null;"
+)
+
+
+# 埋め込み JSON から検索結果の配列（searchResults）を探す（階層は API 版で変わるため深さ優先で探索）
+# 入れ子の searchResults より先に本体の一覧を返すよう、出現順（先に書かれた方）を優先する
+#
+# 引数:
+#   node: json.loads の結果
+#
+# 戻り値:
+#   list or None: searchResults（見つからなければ None）
+def _find_search_results(node) -> Optional[list]:
+    stack = [node]
+    while stack:
+        cur = stack.pop()
+        if isinstance(cur, dict):
+            results = cur.get("searchResults")
+            if isinstance(results, list):
+                return results
+            # スタックは後に積んだものから取り出すので、逆順に積んで出現順に辿る
+            stack.extend(reversed(cur.values()))
+        elif isinstance(cur, list):
+            stack.extend(reversed(cur))
+    return None
+
+
+# 埋め込み JSON の物件 ID を room ID にする（"DemandStayListing:123" の Base64 形式にも対応）
+#
+# 引数:
+#   listing (Dict): listing / demandStayListing
+#
+# 戻り値:
+#   str or None: room ID（数字のみ。取得できなければ None）
+def _room_id_from_state(listing: Dict[str, object]) -> Optional[str]:
+    raw_id = str(listing.get("id") or "")
+    if raw_id.isdigit():
+        return raw_id
+    try:
+        decoded = base64.b64decode(raw_id, validate=True).decode("utf-8")
+    except (ValueError, UnicodeDecodeError):
+        return None
+    room_id = decoded.rsplit(":", 1)[-1]
+    return room_id if room_id.isdigit() else None
+
+
+# 埋め込み JSON の評価表記（例: "4.92 (123)"、新規は "新規"）から評価・レビュー件数を取り出す
+#
+# 引数:
+#   result (Dict): searchResults の1件
+#   listing (Dict): result["listing"]
+#
+# 戻り値:
+#   Tuple[float or None, int or None]: (rating, reviews_count)
+def _rating_from_state(result: Dict[str, object], listing: Dict[str, object]) -> Tuple[Optional[float], Optional[int]]:
+    localized = result.get("avgRatingLocalized") or listing.get("avgRatingLocalized") or ""
+    m = _RATING_LOCALIZED_PATTERN.match(str(localized))
+    if m:
+        return float(m.group(1)), int(m.group(2))
+    rating = listing.get("avgRating")
+    reviews_count = listing.get("reviewsCount")
+    return (
+        float(rating) if isinstance(rating, (int, float)) and rating > 0 else None,
+        int(reviews_count) if isinstance(reviews_count, int) else None,
+    )
+
+
+# 検索結果ページの埋め込み JSON（data-deferred-state）から価格・URL・タイトル・レビュー等を抽出
+# スクロールや DOM 探索なしで全件が得られる。閾値超過・RATING_MIN以下・REVIEWS_COUNT_MIN未満は除外
+#
+# 引数:
+#   driver: Selenium WebDriver
+#   checkin_date (date): 対象日
+#   price_threshold (int or None): 前計算済みの価格閾値（None なら対象日から求める）
+#
+# 戻り値:
+#   List[Dict] or None: extract_price_details_from_cards と同じ形式（埋め込み JSON が無い・読めない場合は None）
+def extract_price_details_from_state(driver, checkin_date: date, price_threshold: Optional[int] = None) -> Optional[List[Dict[str, object]]]:
+    price_lower, price_upper = _price_bounds(checkin_date, price_threshold)
+    try:
+        state_text = driver.execute_script(_DEFERRED_STATE_JS)
+        results = _find_search_results(json.loads(state_text)) if state_text else None
+    except Exception:
+        results = None
+    if not results:
+        return None
+
+    checkout = checkin_date + timedelta(days=1)
+    by_href: Dict[str, Dict[str, object]] = {}
+    loose: List[Dict[str, object]] = []
+    # 検索結果を順に解析して価格等を抽出
+    for idx, result in enumerate(results):
+        if not isinstance(result, dict):
+            continue
+        listing = result.get("listing") or {}
+        price_line = ((result.get("pricingQuote") or {}).get("structuredStayDisplayPrice") or {}).get("primaryLine") or {}
+        label = price_line.get("accessibilityLabel") or ""
+        p = pick_price_from_text(price_line.get("discountedPrice") or price_line.get("price") or "") or pick_price_from_text(label)
+        if p is None or not price_lower <= p < price_upper:
+            continue
+
+        rating, reviews_count = _rating_from_state(result, listing)
+        # structuredContent（例: 寝室2室 · ベッド3台）を補足とし、寝室・ベッド数もここから取る
+        primary_line = (listing.get("structuredContent") or {}).get("primaryLine") or []
+        subtitle = " · ".join(str(item.get("body")) for item in primary_line if isinstance(item, dict) and item.get("body")) or None
+        room_id = _room_id_from_state(listing) or _room_id_from_state(result.get("demandStayListing") or {})
+        href = build_room_url(room_id, checkin_date, checkout) if room_id else ""
+        adults_match = _ADULTS_PATTERN.search(href)
+        listing_details = {
+            "guests": int(adults_match.group(1)) if adults_match else None,
+            "bedrooms": pick_bedrooms_from_text(subtitle) if subtitle else None,
+            "beds": pick_beds_from_text(subtitle) if subtitle else None,
+            "reviews_count": reviews_count,
+            "rating": rating,
+            "subtitle": subtitle,
+        }
+        if _is_excluded_by_reviews(listing_details):
+            continue
+        title = str(result.get("title") or listing.get("title") or listing.get("name") or "").strip()
+
+        if href:
+            by_href[href] = {"listing_url": href, "price_yen": p, "raw_label": label, "title": title, **listing_details}
+        else:
+            loose.append({"listing_url": "", "price_yen": p, "raw_label": label, "title": title, "idx": idx, **listing_details})
+    return list(by_href.values()) + loose
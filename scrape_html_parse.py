@@ -2,8 +2,8 @@
 
 import re
 from datetime import date, timedelta
-from typing import Optional
-from urllib.parse import quote
+from typing import List, Optional
+from urllib.parse import quote, urlencode
 
 # 検索条件（URL組み立て用）
 DESTINATION = "西九条駅"
@@ -20,6 +20,9 @@ PRICE_THRESHOLD_LONG_WEEKEND = 48000
 PRICE_THRESHOLD_2MONTHS = 43000
 PRICE_THRESHOLD_1MONTH = 40000
 
+# 物件URLの /rooms/12345 部分（重複判定で物件ごとに呼ばれるため事前にコンパイル）
+_ROOM_ID_PATTERN = re.compile(r"/rooms/(\d+)")
+
 
 #Airbnb物件URLからroom IDを抽出する（重複判定用）
 #
@@ -33,12 +36,38 @@ def extract_room_id_from_url(url: str) -> Optional[str]:
     if not url:
         return None
     # /rooms/12345 の形式から数値部分を抽出
-    match = re.search(r'/rooms/(\d+)', url)
+    match = _ROOM_ID_PATTERN.search(url)
     if match:
         return match.group(1)
     return None
 
 
+# 検索URLのテンプレート（日付以外の検索条件はモジュール読み込み時に1回だけ組み立てる）
+#
+# 引数:
+#   （なし）
+#
+# 戻り値:
+#   str: {checkin}・{checkout} を差し込む str.format 用テンプレート
+def _build_search_url_template() -> str:
+    # 人数・価格範囲をクエリに組み立て（チェックイン・チェックアウトは差し込み位置のみ）
+    # 価格範囲は未指定（None）ならクエリに含めない
+    params = {
+        "adults": ADULTS,
+        "children": CHILDREN,
+        "infants": INFANTS,
+        "pets": PETS,
+        "price_min": PRICE_MIN,
+        "price_max": PRICE_MAX,
+    }
+    query = urlencode({k: v for k, v in params.items() if v is not None}, quote_via=quote)
+    # quote 済みの値は { } を含まないためそのまま連結できる
+    return f"https://www.airbnb.jp/s/{quote(DESTINATION)}/homes?checkin={{checkin}}&checkout={{checkout}}&{query}"
+
+
+_SEARCH_URL_FORMAT = _build_search_url_template().format
+
+
 # Airbnb検索用URLを組み立てる
 #
 # 引数:
@@ -48,21 +77,24 @@ def extract_room_id_from_url(url: str) -> Optional[str]:
 # 戻り値:
 #   str: 組み立てた検索URL
 def build_search_url(checkin: date, checkout: date) -> str:
-    # チェックイン・チェックアウト・人数・価格範囲をクエリに組み立て
-    params = {
-        "checkin": checkin.isoformat(),
-        "checkout": checkout.isoformat(),
-        "adults": str(ADULTS),
-        "children": str(CHILDREN),
-        "infants": str(INFANTS),
-        "pets": str(PETS),
-    }
-    if PRICE_MIN is not None:
-        params["price_min"] = str(PRICE_MIN)
-    if PRICE_MAX is not None:
-        params["price_max"] = str(PRICE_MAX)
-    query = "&".join([f"{k}={quote(v)}" for k, v in params.items()])
-    return f"https://www.airbnb.jp/s/{quote(DESTINATION)}/homes?{query}"
+    # ISO 形式の日付は URL エンコード不要
+    return _SEARCH_URL_FORMAT(checkin=checkin.isoformat(), checkout=checkout.isoformat())
+
+
+# Airbnb物件ページのURLを組み立てる（検索結果の埋め込み JSON から取得した room ID 用）
+#
+# 引数:
+#   room_id (str): 物件の room ID
+#   checkin (date): チェックイン日
+#   checkout (date): チェックアウト日
+#
+# 戻り値:
+#   str: 組み立てた物件URL
+def build_room_url(room_id: str, checkin: date, checkout: date) -> str:
+    return (
+        f"https://www.airbnb.jp/rooms/{room_id}"
+        f"?adults={ADULTS}&check_in={checkin.isoformat()}&check_out={checkout.isoformat()}"
+    )
 
 
 # お盆期間か判定する（8/13-8/16）
@@ -140,8 +172,30 @@ def is_long_weekend(d: date) -> bool:
 # 戻り値:
 #   int: 価格閾値（円）
 def get_price_threshold(d: date) -> int:
-    today = date.today()
-    days_until = (d - today).days
+    return _price_threshold(d, (d - date.today()).days)
+
+
+# 基準日から days 日分の価格閾値を前計算する（日付ループ内で判定を繰り返さない）
+#
+# 引数:
+#   start (date): 基準日（今日）
+#   days (int): 日数
+#
+# 戻り値:
+#   List[int]: start からの日数 → 価格閾値（円）
+def build_price_thresholds(start: date, days: int) -> List[int]:
+    return [_price_threshold(start + timedelta(days=i), i) for i in range(days)]
+
+
+# 対象日と今日からの日数から価格閾値を決める
+#
+# 引数:
+#   d (date): 対象日
+#   days_until (int): 今日から対象日までの日数
+#
+# 戻り値:
+#   int: 価格閾値（円）
+def _price_threshold(d: date, days_until: int) -> int:
     # 繁忙期 → 祝日閾値 / 直近30日・60日 → 特例閾値 / 60日超 → 通常 or 3連休閾値
     if is_obon_period(d) or is_new_year_period(d) or is_year_end_period(d) or is_golden_week(d):
         return PRICE_THRESHOLD_HOLIDAY
@@ -157,6 +211,19 @@ def get_price_threshold(d: date) -> int:
         return PRICE_THRESHOLD_NORMAL
 
 
+# 価格表記の正規表現（抽出のたびに組み立てずモジュール読み込み時に1回だけコンパイル）
+_YEN = r"[¥￥]"
+_SP = r"[\s\u00a0]*"
+# ¥12,345/泊 や 1泊あたり¥12,345 などをマッチ
+_PRICE_PATTERNS = [
+    re.compile(rf"{_YEN}{_SP}([\d,]+){_SP}(?:/|／){_SP}泊"),
+    re.compile(rf"{_YEN}{_SP}([\d,]+){_SP}（{_SP}1泊{_SP}）"),
+    re.compile(rf"1泊あたり{_SP}{_YEN}{_SP}([\d,]+)"),
+    re.compile(rf"{_YEN}{_SP}([\d,]+){_SP}泊"),
+]
+_YEN_AMOUNT_PATTERN = re.compile(rf"{_YEN}{_SP}([\d,]+)")
+
+
 # テキストから金額（円）を抽出する
 #
 # 引数:
@@ -165,32 +232,31 @@ def get_price_threshold(d: date) -> int:
 # 戻り値:
 #   int or None: 抽出した金額（見つからなければ None）
 def pick_price_from_text(text: str) -> Optional[int]:
-    t = text.replace("\n", " ").strip()
-    yen = r"[¥￥]"
-    sp = r"[\s\u00a0]*"
-    # ¥12,345/泊 や 1泊あたり¥12,345 などをマッチ
-    patterns = [
-        rf"{yen}{sp}([\d,]+){sp}(?:/|／){sp}泊",
-        rf"{yen}{sp}([\d,]+){sp}（{sp}1泊{sp}）",
-        rf"1泊あたり{sp}{yen}{sp}([\d,]+)",
-        rf"{yen}{sp}([\d,]+){sp}泊",
-    ]
     # パターンを順に試して金額を抽出
-    for pat in patterns:
-        m = re.search(pat, t)
+    for pat in _PRICE_PATTERNS:
+        m = pat.search(text)
         if m:
             return int(m.group(1).replace(",", ""))
-    yen_matches = list(re.finditer(rf"{yen}{sp}([\d,]+)", t))
-    #
-    if not yen_matches:
-        return None
-    for m in yen_matches:
+    # 直前10文字に「合計」がある金額は総額とみなして飛ばす（すべて総額なら最初の金額）
+    first = None
+    for m in _YEN_AMOUNT_PATTERN.finditer(text):
         start = m.start()
-        ctx = t[max(0, start - 10) : start]
-        if "合計" in ctx:
-            continue
-        return int(m.group(1).replace(",", ""))
-    return int(yen_matches[0].group(1).replace(",", ""))
+        if text.find("合計", max(0, start - 10), start) < 0:
+            return int(m.group(1).replace(",", ""))
+        if first is None:
+            first = m
+    return int(first.group(1).replace(",", "")) if first is not None else None
+
+
+# ゲスト数表記の正規表現
+_GUESTS_PATTERNS = [
+    re.compile(r"(\d+)\s*名", re.IGNORECASE),
+    re.compile(r"(\d+)\s*guests?", re.IGNORECASE),
+    re.compile(r"(\d+)\s*人(?:まで)?", re.IGNORECASE),
+    re.compile(r"定員[：:]\s*(\d+)", re.IGNORECASE),
+    re.compile(r"最大[：:]\s*(\d+)", re.IGNORECASE),
+    re.compile(r"(\d+)\s*人まで", re.IGNORECASE),
+]
 
 
 # テキストからゲスト数を抽出する
@@ -201,23 +267,22 @@ def pick_price_from_text(text: str) -> Optional[int]:
 # 戻り値:
 #   int or None: 抽出したゲスト数（見つからなければ None）
 def pick_guests_from_text(text: str) -> Optional[int]:
-    t = text.replace("\n", " ").strip()
-    patterns = [
-        r"(\d+)\s*名",
-        r"(\d+)\s*guests?",
-        r"(\d+)\s*人(?:まで)?",
-        r"定員[：:]\s*(\d+)",
-        r"最大[：:]\s*(\d+)",
-        r"(\d+)\s*人まで",
-    ]
     # パターンを順に試してゲスト数を抽出
-    for pat in patterns:
-        m = re.search(pat, t, re.IGNORECASE)
+    for pat in _GUESTS_PATTERNS:
+        m = pat.search(text)
         if m:
             return int(m.group(1))
     return None
 
 
+# 寝室数表記の正規表現
+_BEDROOMS_PATTERNS = [
+    re.compile(r"(\d+)\s*bedrooms?", re.IGNORECASE),
+    re.compile(r"(\d+)\s*寝室", re.IGNORECASE),
+    re.compile(r"(\d+)\s*BR", re.IGNORECASE),
+]
+
+
 # テキストから寝室数を抽出する
 #
 # 引数:
@@ -226,20 +291,21 @@ def pick_guests_from_text(text: str) -> Optional[int]:
 # 戻り値:
 #   int or None: 抽出した寝室数（見つからなければ None）
 def pick_bedrooms_from_text(text: str) -> Optional[int]:
-    t = text.replace("\n", " ").strip()
-    patterns = [
-        r"(\d+)\s*bedrooms?",
-        r"(\d+)\s*寝室",
-        r"(\d+)\s*BR",
-    ]
     # パターンを順に試して寝室数を抽出
-    for pat in patterns:
-        m = re.search(pat, t, re.IGNORECASE)
+    for pat in _BEDROOMS_PATTERNS:
+        m = pat.search(text)
         if m:
             return int(m.group(1))
     return None
 
 
+# ベッド数表記の正規表現
+_BEDS_PATTERNS = [
+    re.compile(r"(\d+)\s*beds?", re.IGNORECASE),
+    re.compile(r"(\d+)\s*ベッド", re.IGNORECASE),
+]
+
+
 # テキストからベッド数を抽出する
 #
 # 引数:
@@ -248,19 +314,26 @@ def pick_bedrooms_from_text(text: str) -> Optional[int]:
 # 戻り値:
 #   int or None: 抽出したベッド数（見つからなければ None）
 def pick_beds_from_text(text: str) -> Optional[int]:
-    t = text.replace("\n", " ").strip()
-    patterns = [
-        r"(\d+)\s*beds?",
-        r"(\d+)\s*ベッド",
-    ]
     # パターンを順に試してベッド数を抽出
-    for pat in patterns:
-        m = re.search(pat, t, re.IGNORECASE)
+    for pat in _BEDS_PATTERNS:
+        m = pat.search(text)
         if m:
             return int(m.group(1))
     return None
 
 
+# レビュー件数表記の正規表現
+_REVIEWS_COUNT_PATTERNS = [
+    re.compile(r"\((\d+)\)", re.IGNORECASE),
+    re.compile(r"(\d+\.?\d*)\s*\((\d+)\)", re.IGNORECASE),
+    re.compile(r"レビュー\s*(\d+)\s*件", re.IGNORECASE),
+    re.compile(r"(\d+)\s*reviews?", re.IGNORECASE),
+    re.compile(r"(\d+)\s*件のレビュー", re.IGNORECASE),
+    re.compile(r"(\d+)\s*レビュー", re.IGNORECASE),
+    re.compile(r"レビュー[：:]\s*(\d+)", re.IGNORECASE),
+]
+
+
 # テキストからレビュー件数を抽出する
 #
 # 引数:
@@ -269,19 +342,9 @@ def pick_beds_from_text(text: str) -> Optional[int]:
 # 戻り値:
 #   int or None: 抽出したレビュー件数（見つからなければ None）
 def pick_reviews_count_from_text(text: str) -> Optional[int]:
-    t = text.replace("\n", " ").strip()
-    patterns = [
-        r"\((\d+)\)",
-        r"(\d+\.?\d*)\s*\((\d+)\)",
-        r"レビュー\s*(\d+)\s*件",
-        r"(\d+)\s*reviews?",
-        r"(\d+)\s*件のレビュー",
-        r"(\d+)\s*レビュー",
-        r"レビュー[：:]\s*(\d+)",
-    ]
     # 複数の表記パターンを順に試してレビュー件数を抽出
-    for pat in patterns:
-        m = re.search(pat, t, re.IGNORECASE)
+    for pat in _REVIEWS_COUNT_PATTERNS:
+        m = pat.search(text)
         if m:
             try:
                 if len(m.groups()) >= 2:
@@ -293,6 +356,23 @@ def pick_reviews_count_from_text(text: str) -> Optional[int]:
     return None
 
 
+# 評価表記の正規表現
+_RATING_PATTERNS = [
+    re.compile(r"\d+つ星中\s*(\d+\.?\d*)\s*つ星", re.IGNORECASE),
+    re.compile(r"(\d+\.?\d*)\s*\((\d+)\)", re.IGNORECASE),
+    re.compile(r"[★⭐]\s*(\d+\.?\d*)", re.IGNORECASE),
+    re.compile(r"^(\d+\.?\d*)\s*\(", re.IGNORECASE),
+    # 「5つ星中」の満点側と、その直後（空白1文字まで）の数値は評価として拾わない（後読みは固定長のみ）
+    re.compile(r"(?<![\d.])(?<!つ星中)(?<!つ星中\s)(\d+\.?\d*)\s*つ星(?!中)", re.IGNORECASE),
+    re.compile(r"(\d+\.?\d*)\s*stars?", re.IGNORECASE),
+    re.compile(r"(\d+\.?\d*)\s*点", re.IGNORECASE),
+    re.compile(r"評価[：:]\s*(\d+\.?\d*)", re.IGNORECASE),
+]
+# テキスト全体が評価値だけの表記（小数 or 1〜5 の整数。fullmatch で判定）
+# 上のパターンはこの形に一致しないため、先に試しても結果は同じ
+_RATING_WHOLE_TEXT_PATTERN = re.compile(r"(\d+\.\d+|[1-5])")
+
+
 # テキストから評価（rating）を抽出する
 #
 # 引数:
@@ -301,22 +381,17 @@ def pick_reviews_count_from_text(text: str) -> Optional[int]:
 # 戻り値:
 #   float or None: 抽出した評価（見つからなければ None）
 def pick_rating_from_text(text: str) -> Optional[float]:
-    t = text.replace("\n", " ").strip()
-    patterns = [
-        r"\d+つ星中\s*(\d+\.?\d*)\s*つ星",
-        r"(\d+\.?\d*)\s*\((\d+)\)",
-        r"[★⭐]\s*(\d+\.?\d*)",
-        r"^(\d+\.?\d*)\s*\(",
-        r"(?<!\d+つ星中\s*)(\d+\.?\d*)\s*つ星",
-        r"(\d+\.?\d*)\s*stars?",
-        r"(\d+\.?\d*)\s*点",
-        r"評価[：:]\s*(\d+\.?\d*)",
-        r"^(\d+\.\d+)$",
-        r"^([1-5])$",
-    ]
+    # 改行は \s で吸収できるので置換しない（^ のパターンと fullmatch のため前後の空白だけ除く）
+    t = text.strip()
+    # 評価値だけのテキスト（評価の span 等）は先に判定する（パターン上 float 変換は失敗しない）
+    m = _RATING_WHOLE_TEXT_PATTERN.fullmatch(t)
+    if m:
+        rating_value = float(m.group(1))
+        if 0 < rating_value <= 5.0:
+            return rating_value
     # 表記パターンを順に試して評価値を抽出
-    for pat in patterns:
-        m = re.search(pat, t, re.IGNORECASE)
+    for pat in _RATING_PATTERNS:
+        m = pat.search(t)
         if m:
             try:
                 rating_value = float(m.group(1))